@@ -0,0 +1,42 @@
+"""
+Scaling of `ANSIString.render(parallel=True)` from 1 to N workers on one
+large styled capture, against the serial render.
+
+Usage:
+    python benchmarks/render_parallel.py [size in MB] [max workers] [thread|process]
+"""
+
+import os
+import sys
+from time import perf_counter
+
+from pyansistring import ANSIString
+from pyansistring.constants import SGR, Foreground
+
+LINE = "2024-05-01 12:00:00 INFO request=1234 path=/api/items took=12ms\n"
+
+
+def make_capture(size: int) -> ANSIString:
+    capture = ANSIString(LINE * (size // len(LINE)))
+    capture.fg_4b(Foreground.CYAN, slice(0, len(capture), 3))
+    capture.fm(SGR.BOLD, slice(0, len(capture), 5))
+    return capture
+
+
+def time_render(capture: ANSIString, **kwargs) -> float:
+    capture.styles[0] = capture.styles[0]  # a new version: `styled` is not cached
+    start = perf_counter()
+    capture.render(**kwargs)
+    return perf_counter() - start
+
+
+if __name__ == "__main__":
+    size = int(float(sys.argv[1]) * 2**20) if len(sys.argv) > 1 else 32 * 2**20
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+    executor = sys.argv[3] if len(sys.argv) > 3 else None
+    capture = make_capture(size)
+    serial = time_render(capture)
+    print(f"{'serial':>10}: {serial:7.2f}s")
+    for workers in range(1, max_workers + 1):
+        elapsed = time_render(capture, parallel=True, workers=workers, executor=executor)
+        print(f"{workers:>3} workers: {elapsed:7.2f}s ({serial / elapsed:4.1f}x)")
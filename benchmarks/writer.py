@@ -0,0 +1,61 @@
+"""
+Throughput of `ANSIWriter` against a naive `print` loop, writing styled log
+lines to a pipe drained by a child process.
+
+Usage:
+    python benchmarks/writer.py [number of lines]
+"""
+
+import subprocess
+import sys
+from time import perf_counter
+
+from pyansistring import ANSIString, ANSIWriter, Highlighter
+from pyansistring.constants import SGR, Foreground
+
+DRAIN = "import os, shutil, sys; shutil.copyfileobj(sys.stdin.buffer, open(os.devnull, 'wb'))"
+
+HIGHLIGHTER = Highlighter([
+    (Foreground.RED, r"\bERROR\b"),
+    (Foreground.YELLOW, r"\bWARN\b"),
+    ({"key": SGR.BOLD}, r"(?P<key>\w+)="),
+    (Foreground.CYAN, r"\d+ms"),
+])
+
+
+def make_lines(count: int) -> list[ANSIString]:
+    levels = ("INFO", "WARN", "ERROR")
+    return [
+        HIGHLIGHTER(f"{levels[index % 3]} request={index} path=/api/items took={index % 500}ms\n")
+        for index in range(count)
+    ]
+
+
+def run(name: str, write, count: int) -> None:
+    drain = subprocess.Popen([sys.executable, "-c", DRAIN], stdin=subprocess.PIPE)
+    stdout = open(drain.stdin.fileno(), "w", encoding="utf-8", closefd=False)
+    lines = make_lines(count)
+    start = perf_counter()
+    write(stdout, lines)
+    stdout.flush()
+    elapsed = perf_counter() - start
+    drain.stdin.close()
+    drain.wait()
+    print(f"{name:>12}: {count / elapsed:>12,.0f} lines/s")
+
+
+def naive(stdout, lines: list[ANSIString]) -> None:
+    for line in lines:
+        print(line, end="", file=stdout, flush=True)
+
+
+def writer(stdout, lines: list[ANSIString]) -> None:
+    with ANSIWriter(stdout, flush_interval=0.05) as sink:
+        for line in lines:
+            sink.write(line)
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    run("print", naive, count)
+    run("ANSIWriter", writer, count)
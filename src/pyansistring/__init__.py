@@ -8,9 +8,25 @@ __all__ = [
     "helpers",
     "arts",
     "ANSIString",
+    "FrozenANSIString",
     "StyleDict",
+    "FrozenStyleDict",
+    "RenderCache",
+    "enable_render_cache",
+    "disable_render_cache",
+    "MulticolorProgram",
+    "ANSICanvas",
+    "Highlighter",
+    "ANSIWriter",
+    "AsyncANSIWriter",
+    "write_async",
+    "StyledTemplate",
 ]
 __title__ = "pyansistring"
 __license__ = "MIT"
 
 from pyansistring.pyansistring import *
+from pyansistring.canvas import *
+from pyansistring.highlighter import *
+from pyansistring.streams import *
+from pyansistring.template import *
@@ -1,9 +1,16 @@
 __all__ = [
     "PLAIN_ARTS",
     "COLORED_ARTS",
+    "ArtRegistry",
 ]
 
-from pyansistring.pyansistring import ANSIString
+import json
+import os
+from collections.abc import Iterator, Mapping
+from hashlib import sha256
+from random import Random
+
+from pyansistring.pyansistring import ANSIString, StyleDict
 
 
 PLAIN_ARTS = {
@@ -171,13 +178,122 @@ STYLES = {
 }
 
 
-COLORED_ARTS = {}
-for name, art in PLAIN_ARTS.items():
-    colored = ANSIString(art)
-    if name in STYLES:
-        for sequence, coordinates in STYLES[name].items():
-            colored.multicolor_c(sequence, *coordinates)
-    COLORED_ARTS[name] = colored
+ArtProgram = tuple[tuple[str, tuple[tuple[int, ...], ...]], ...]
+
+
+class ArtRegistry(Mapping[str, ANSIString]):
+    """
+    A read-only mapping of art names to colored arts, resolved lazily on
+    first access.
+
+    Styles of an art are compiled once into a compact program: multicolor
+    sequences with the linear indices of their steps instead of (x, y)
+    coordinates. With a `seed` and a `cache_dir`, colored arts are also
+    cached on disk as JSON, keyed by the art name, the program hash and the
+    seed, so that later processes only load them. Without a seed, "random"
+    values differ on every resolution and nothing is cached on disk.
+
+    Usage:
+        >>> arts = ArtRegistry(PLAIN_ARTS, STYLES, seed=0, cache_dir="~/.cache/pyansistring")
+        >>> print(arts["BANNER"])
+    """
+
+    CACHE_VERSION = 1
+
+    def __init__(
+        self,
+        arts: Mapping[str, str],
+        styles: Mapping[str, Mapping[str, tuple]],
+        seed: int | None = None,
+        cache_dir: str | os.PathLike | None = None,
+    ) -> None:
+        self.arts = arts
+        self.styles = styles
+        self.seed = seed
+        self.cache_dir = None if cache_dir is None else os.path.expanduser(cache_dir)
+        self._programs: dict[str, ArtProgram] = {}
+        self._colored: dict[str, ANSIString] = {}
+
+    def __getitem__(self, name: str) -> ANSIString:
+        colored = self._colored.get(name)
+        if colored is None:
+            colored = self._colored[name] = self._load(name) or self._color(name)
+        return colored
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.arts)
+
+    def __len__(self) -> int:
+        return len(self.arts)
+
+    def program(self, name: str) -> ArtProgram:
+        """Returns the compiled style program of the art."""
+        program = self._programs.get(name)
+        if program is None:
+            art = ANSIString(self.arts[name])
+            program = tuple(
+                (sequence, tuple(
+                    tuple(slice_.start for slice_ in obj) if isinstance(obj, tuple) else (obj.start,)
+                    for obj in art.coords_to_slices(*coordinates)
+                ))
+                for sequence, coordinates in self.styles.get(name, {}).items()
+            )
+            self._programs[name] = program
+        return program
+
+    def program_hash(self, name: str) -> str:
+        """Returns a hash of the art and its compiled style program."""
+        data = repr((self.CACHE_VERSION, self.arts[name], self.program(name)))
+        return sha256(data.encode()).hexdigest()[:16]
+
+    def _color(self, name: str) -> ANSIString:
+        colored = ANSIString(self.arts[name])
+        rng = None if self.seed is None else Random(self.seed)
+        for sequence, groups in self.program(name):
+            colored.multicolor(
+                sequence,
+                *(tuple(slice(index, index + 1) for index in group) for group in groups),
+                seed=rng,
+            )
+        self._store(name, colored)
+        return colored
+
+    def _cache_path(self, name: str) -> str | None:
+        if self.cache_dir is None or self.seed is None:
+            return None
+        return os.path.join(self.cache_dir, f"{name}-{self.program_hash(name)}-{self.seed}.json")
+
+    def _load(self, name: str) -> ANSIString | None:
+        path = self._cache_path(name)
+        if path is None:
+            return None
+        try:
+            with open(path, encoding="utf-8") as file:
+                styles = json.load(file)
+            return ANSIString(
+                self.arts[name], StyleDict({int(index): style for index, style in styles.items()})
+            )
+        except (OSError, ValueError, AttributeError):
+            return None
+
+    def _store(self, name: str, colored: ANSIString) -> None:
+        path = self._cache_path(name)
+        if path is None:
+            return
+        temporary = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(temporary, "w", encoding="utf-8") as file:
+                json.dump(dict(colored.styles), file, ensure_ascii=False)
+            os.replace(temporary, path)
+        except OSError:
+            try:
+                os.remove(temporary)
+            except OSError:
+                pass
+
+
+COLORED_ARTS = ArtRegistry(PLAIN_ARTS, STYLES)
 
 if __name__ == "__main__":
     print(COLORED_ARTS["BANNER"])
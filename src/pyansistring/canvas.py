@@ -0,0 +1,208 @@
+__all__ = [
+    "ANSICanvas",
+]
+
+from bisect import bisect_right
+from collections.abc import Generator
+from typing import Self
+
+from pyansistring.pyansistring import ANSIString, StyleDict
+
+
+class ANSICanvas:
+    r"""
+    A fixed-size 2D grid of styled characters stored row by row, useful for
+    art and dashboards.
+
+    Every row keeps its characters, its styles (x -> ANSI escape sequences,
+    like `ANSIString.styles`) and its last rendering, so changing a cell only
+    re-renders its row.
+
+    Instance Attributes:
+        width: number of columns.
+        height: number of rows.
+        fillchar: character of empty cells.
+
+    Usage:
+        >>> canvas = ANSICanvas(80, 24)
+        >>> canvas.put(2, 1, "CPU", "\x1b[1m")
+        >>> canvas.fill(2, 2, 10, 1, "█", HUE_STYLES[120].fg)
+        >>> print(canvas)
+        >>> for y, row in canvas.render_changed(): ...  # only rows changed since the last call
+    """
+
+    def __init__(self, width: int, height: int, fillchar: str = " ") -> None:
+        if width < 0 or height < 0:
+            raise ValueError(f"negative canvas size ({width}x{height})")
+        if len(fillchar) != 1:
+            raise TypeError("The fill character must be exactly one character long")
+        self.width = width
+        self.height = height
+        self.fillchar = fillchar
+        self._chars = [[fillchar] * width for _ in range(height)]
+        self._styles: list[dict[int, str]] = [{} for _ in range(height)]
+        self._rendered: list[str | None] = [None] * height
+        self._dirty = set(range(height))
+
+    @classmethod
+    def from_ansistring(cls, string: ANSIString | str, fillchar: str = " ") -> Self:
+        """Creates a canvas from the lines of the string (padded to the longest one)."""
+        if not isinstance(string, ANSIString):
+            string = ANSIString(string)
+        starts, lengths = string._get_line_index()
+        canvas = cls(max(lengths, default=0), len(lengths), fillchar)
+        plain = string.plain
+        for y, (start, length) in enumerate(zip(starts, lengths)):
+            canvas._chars[y][:length] = plain[start:start + length]
+        for index, style in string.styles.items():
+            y = bisect_right(starts, index) - 1
+            x = index - starts[y]
+            if 0 <= y < canvas.height and x < lengths[y]:
+                canvas._styles[y][x] = style
+        return canvas
+
+    def to_ansistring(self) -> ANSIString:
+        """Returns the canvas as a multiline `ANSIString`."""
+        styles, offset = {}, 0
+        for row in self._styles:
+            styles.update({offset + x: style for x, style in row.items()})
+            offset += self.width + 1
+        return ANSIString("\n".join(map("".join, self._chars)), StyleDict(styles))
+
+    def _check(self, x: int, y: int) -> None:
+        if not (0 <= y < self.height):
+            raise IndexError(f"wrong y coordinate (0<=y<{self.height})")
+        elif not (0 <= x < self.width):
+            raise IndexError(f"wrong x coordinate (0<=x<{self.width})")
+
+    @staticmethod
+    def _check_char(char: str) -> None:
+        if len(char) != 1:
+            raise ValueError(f"a cell holds exactly one character (got {char!r})")
+
+    def _touch(self, y: int) -> None:
+        self._rendered[y] = None
+        self._dirty.add(y)
+
+    def get(self, x: int, y: int) -> tuple[str, str | None]:
+        """Returns the character and the style of the cell."""
+        self._check(x, y)
+        return self._chars[y][x], self._styles[y].get(x)
+
+    def set(self, x: int, y: int, style: str | None, char: str | None = None) -> Self:
+        """Sets the style (and optionally the character) of the cell; `None` removes the style."""
+        self._check(x, y)
+        if char is not None:
+            self._check_char(char)
+            self._chars[y][x] = char
+        if style:
+            self._styles[y][x] = style
+        else:
+            self._styles[y].pop(x, None)
+        self._touch(y)
+        return self
+
+    def put(self, x: int, y: int, text: str | ANSIString, style: str | None = None) -> Self:
+        """
+        Writes the text from the cell to the right (clipped to the canvas),
+        each of its lines from column x of the next row, with the given
+        style or with the styles of an `ANSIString`.
+        """
+        self._check(0, y)
+        if isinstance(text, ANSIString):
+            if style is None:
+                return self.blit(ANSICanvas.from_ansistring(text), x, y)
+            text = text.plain
+        for y, line in enumerate(text.splitlines(), y):
+            if y >= self.height:
+                break
+            start, stop = max(x, 0), min(x + len(line), self.width)
+            if start >= stop:
+                continue
+            self._chars[y][start:stop] = line[start - x:stop - x]
+            row = self._styles[y]
+            for column in range(start, stop):
+                if style:
+                    row[column] = style
+                else:
+                    row.pop(column, None)
+            self._touch(y)
+        return self
+
+    def fill(
+        self, x: int, y: int, width: int, height: int,
+        char: str | None = None, style: str | None = None,
+    ) -> Self:
+        """
+        Fills the rectangle (clipped to the canvas) with the character and
+        the style; `char=None` keeps the characters, `style=None` removes styles.
+        """
+        if char is not None:
+            self._check_char(char)
+        left, right = max(x, 0), min(x + width, self.width)
+        for row in range(max(y, 0), min(y + height, self.height)):
+            if left >= right:
+                break
+            if char is not None:
+                self._chars[row][left:right] = char * (right - left)
+            styles = self._styles[row]
+            if style:
+                styles.update(dict.fromkeys(range(left, right), style))
+            else:
+                for column in range(left, right):
+                    styles.pop(column, None)
+            self._touch(row)
+        return self
+
+    def clear(self) -> Self:
+        """Fills the whole canvas with `fillchar` and removes all styles."""
+        return self.fill(0, 0, self.width, self.height, self.fillchar)
+
+    def blit(self, other: "ANSICanvas", x: int = 0, y: int = 0) -> Self:
+        """Copies the cells of another canvas (clipped) with its top-left corner at (x, y)."""
+        left, right = max(x, 0), min(x + other.width, self.width)
+        if left >= right:
+            return self
+        for row in range(max(y, 0), min(y + other.height, self.height)):
+            source = row - y
+            self._chars[row][left:right] = other._chars[source][left - x:right - x]
+            styles = self._styles[row]
+            for column in range(left, right):
+                style = other._styles[source].get(column - x)
+                if style:
+                    styles[column] = style
+                else:
+                    styles.pop(column, None)
+            self._touch(row)
+        return self
+
+    def render_row(self, y: int) -> str:
+        """Returns the rendered row (cached until the row changes)."""
+        rendered = self._rendered[y]
+        if rendered is None:
+            styles = self._styles[y]
+            rendered = "".join(
+                f"{styles[x]}{char}\x1b[0m" if x in styles else char
+                for x, char in enumerate(self._chars[y])
+            )
+            self._rendered[y] = rendered
+        return rendered
+
+    def render(self) -> str:
+        """Returns the rendered canvas."""
+        return "\n".join(map(self.render_row, range(self.height)))
+
+    def render_changed(self) -> Generator[tuple[int, str]]:
+        """
+        Yields (y, rendered row) for the rows changed since the previous call
+        (all rows at first), e.g. to redraw only them with cursor movements.
+        """
+        dirty, self._dirty = sorted(self._dirty), set()
+        for y in dirty:
+            yield y, self.render_row(y)
+
+    def __str__(self) -> str:
+        return self.render()
+
+    def __repr__(self) -> str:
+        return f"ANSICanvas({self.width}, {self.height}, {self.fillchar!r})"
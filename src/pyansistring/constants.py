@@ -165,7 +165,7 @@ class Regex:
         r"(?P<mode>fg|bg|ul)?"
         rf"(?P<minmax>minmax{ARGUMENTS.format(INT_OR_FLOAT_OR_INF, INT_OR_FLOAT_OR_INF, quantifier=r'{1}')})?"
     )
-    MULTICOLOR_COMMAND = compile(r"(?P<reset>\?|\?\?)?(?P<repeat>repeat\(\d+\))?$")
+    MULTICOLOR_COMMAND = compile(r"(?P<reset>\?|\?\?)?(?:repeat\((?P<repeat>\d+|auto)\))?$")
 
 
 class MulticolorSequences:
@@ -1,35 +1,238 @@
 __all__ = [
+    "WordMatcher",
     "search_word_spans",
     "search_separators",
     "rsearch_separators",
+    "char_width",
+    "display_width",
+    "fit_width",
+    "wrap_spans",
     "clamp",
     "hsl_to_rgb",
+    "hsl_to_rgb_many",
+    "rainbow_hues",
+    "HueStyles",
+    "HUE_STYLES",
+    "accumulate",
+    "to_channel",
+    "rgb_sgr_many",
     "ValueRange",
     "Length",
 ]
 
-from collections.abc import Generator
+import re
+import unicodedata
+from collections.abc import Generator, Sequence
 from dataclasses import dataclass
+from functools import lru_cache
+from typing import NamedTuple
 
-from pyansistring.constants import WHITESPACE
+from pyansistring.constants import WHITESPACE, Background, Foreground, Underline
 
+try:
+    import numpy
+except ImportError:  # NumPy is optional, pure Python is used instead
+    numpy = None
 
-def search_word_spans(string: str, word: str) -> Generator[tuple[int, int]]:
-    """Searches for a word spans in a string."""
-    temp, start = "", None
-    for index, char in enumerate(string):
-        if len(temp) < len(word):
-            if char in word[len(temp)]:
-                temp += char
-                if start is None:
-                    start = index
-            else:
-                start, temp = None, ""
+# Minimum number of values for which the NumPy implementations are used
+VECTORIZE_THRESHOLD = 256
+
+
+# Minimum number of words for which `WordMatcher` uses an Aho–Corasick automaton
+AHO_CORASICK_THRESHOLD = 512
+
+# Maximum number of transitions through failure links memoized by a `WordMatcher`
+MAX_MEMOIZED_TRANSITIONS = 1 << 16
+
+
+try:
+    from re._casefix import _EXTRA_CASES
+except ImportError:  # Python < 3.11
+    from sre_compile import _ignorecase_fixes as _EXTRA_CASES
+
+
+def _case_key(char: str) -> str:
+    """A char of the case class of the char (simple uppercase, then lowercase)."""
+    upper = char.upper()
+    lower = (char if len(upper) != 1 else upper).lower()
+    return lower[0]
+
+
+def _case_aliases() -> dict[str, str]:
+    """The keys of the case classes merged by `re` (as "ſ" with "s"), to their smallest key."""
+    aliases: dict[str, str] = {}
+    for code, codes in _EXTRA_CASES.items():
+        keys = {aliases.get(key, key) for key in map(_case_key, map(chr, (code, *codes)))}
+        smallest = min(keys)
+        for key, alias in tuple(aliases.items()):
+            if alias in keys:
+                aliases[key] = smallest
+        for key in keys - {smallest}:
+            aliases[key] = smallest
+    return aliases
+
+
+class _CaseFolding(dict):
+    """`str.translate` table mapping the chars to the key of their `re.IGNORECASE` case class."""
+
+    __slots__ = ("_aliases",)
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._aliases = _case_aliases()
+
+    def __missing__(self, code: int) -> int:
+        key = _case_key(chr(code))
+        self[code] = folded = ord(self._aliases.get(key, key))
+        return folded
+
+
+_CASE_FOLDING = _CaseFolding()
+
+
+def _fold(string: str) -> str:
+    """
+    Maps the chars of the string to the key of their case class, keeping its
+    length (and so the indices): folded strings are equal when the strings
+    match with `re.IGNORECASE`.
+    """
+    if string.isascii():
+        return string.lower()
+    return string.translate(_CASE_FOLDING)
+
+
+class WordMatcher:
+    """
+    Finds the spans of words in strings with the semantics of a regex
+    alternation of them: matches do not overlap, the leftmost one wins, and
+    among words matching at the same index the one listed first wins.
+
+    Up to `AHO_CORASICK_THRESHOLD` words, a regex is used; for larger word
+    sets, an Aho–Corasick automaton finds all the spans in one pass, in time
+    linear in the length of the string (a regex alternation tries every word
+    at every index).
+
+    Without `case_sensitive`, words match as with `re.IGNORECASE`, whichever
+    the method (the automaton folds the words and the strings char by char
+    to the case classes of `re`).
+
+    Usage:
+        >>> matcher = WordMatcher.compile(("ERROR", "WARN"), case_sensitive=False)
+        >>> tuple(matcher.spans("error: warning"))  # ((0, 5), (7, 11))
+    """
+
+    __slots__ = (
+        "words", "case_sensitive", "_pattern", "_goto", "_fail", "_outputs", "_skip", "_memoized",
+    )
+
+    def __init__(self, words: Sequence[str], case_sensitive: bool = True) -> None:
+        self.words = tuple(words)
+        self.case_sensitive = case_sensitive
+        self._pattern = None
+        if len(self.words) < AHO_CORASICK_THRESHOLD or "" in self.words:
+            self._pattern = re.compile(
+                "|".join(map(re.escape, self.words)), 0 if case_sensitive else re.IGNORECASE
+            )
         else:
-            yield start, index
-            start, temp = None, ""
-    if temp and len(temp) == len(word):
-        yield (start, index + 1)
+            self._build()
+
+    @staticmethod
+    def compile(words: Sequence[str], case_sensitive: bool = True) -> "WordMatcher":
+        """Returns a cached `WordMatcher` for the words."""
+        return _compile_word_matcher(tuple(words), case_sensitive)
+
+    def _build(self) -> None:
+        goto: list[dict[str, int]] = [{}]
+        # (priority, length) of the words ending at each state
+        outputs: list[list[tuple[int, int]]] = [[]]
+        for priority, word in enumerate(self.words):
+            if not self.case_sensitive:
+                word = _fold(word)
+            state = 0
+            for char in word:
+                if char not in goto[state]:
+                    goto[state][char] = len(goto)
+                    goto.append({})
+                    outputs.append([])
+                state = goto[state][char]
+            if not outputs[state]:
+                outputs[state].append((priority, len(word)))
+
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        for state in queue:
+            for char, child in goto[state].items():
+                queue.append(child)
+                link = fail[state]
+                while link and char not in goto[link]:
+                    link = fail[link]
+                fail[child] = goto[link].get(char, 0)
+                outputs[child] = outputs[child] + outputs[fail[child]]
+
+        self._goto = goto
+        self._fail = fail
+        self._outputs = outputs
+        self._memoized = 0
+        self._skip = re.compile(
+            "[" + "".join(map(re.escape, goto[0])) + "]"
+        ).search
+
+    def spans(self, string: str) -> Generator[tuple[int, int]]:
+        """Lazily yields the (start, stop) spans of the words in the string."""
+        if self._pattern is not None:
+            for match in self._pattern.finditer(string):
+                yield match.span()
+            return
+        if not self.case_sensitive:
+            string = _fold(string)
+
+        goto, fail, outputs, skip = self._goto, self._fail, self._outputs, self._skip
+        matches = []
+        state, index, length = 0, 0, len(string)
+        while index < length:
+            if not state:
+                found = skip(string, index)
+                if found is None:
+                    break
+                index = found.start()
+            char = string[index]
+            transitions = goto[state]
+            if char in transitions:
+                state = transitions[char]
+            else:
+                target = fail[state]
+                while target and char not in goto[target]:
+                    target = fail[target]
+                target = goto[target].get(char, 0)
+                # memoize the transition through the failure links, up to a bound
+                # as the automaton is cached and shared
+                if self._memoized < MAX_MEMOIZED_TRANSITIONS:
+                    transitions[char] = target
+                    self._memoized += 1
+                state = target
+            index += 1
+            if outputs[state]:
+                matches.extend(
+                    (index - size, priority, index) for priority, size in outputs[state]
+                )
+
+        position = 0
+        for start, _, stop in sorted(matches):
+            if start >= position:
+                yield start, stop
+                position = stop
+
+
+@lru_cache(maxsize=128)
+def _compile_word_matcher(words: tuple[str, ...], case_sensitive: bool) -> WordMatcher:
+    return WordMatcher(words, case_sensitive)
+
+
+def search_word_spans(
+    string: str, *words: str, case_sensitive: bool = True
+) -> Generator[tuple[int, int]]:
+    """Searches for the spans of the words in a string (see `WordMatcher`)."""
+    return WordMatcher.compile(words, case_sensitive).spans(string)
 
 
 def search_separators(string: str, allowed: set = WHITESPACE):
@@ -50,6 +253,133 @@ def rsearch_separators(string: str, allowed: set = WHITESPACE):
     return search_separators(string[::-1], allowed)
 
 
+def _char_width(code: int) -> int:
+    char = chr(code)
+    if (
+        unicodedata.combining(char)
+        or unicodedata.category(char) in ("Mn", "Me", "Cf", "Cc", "Cs")
+        or 0x1160 <= code <= 0x11FF  # Hangul vowels and final consonants of decomposed syllables
+    ):
+        return 0
+    return 2 if unicodedata.east_asian_width(char) in ("W", "F") else 1
+
+
+@lru_cache(maxsize=1)
+def _bmp_widths() -> bytes:
+    """The widths of the Basic Multilingual Plane (built on the first use, ~64 KiB)."""
+    return bytes(map(_char_width, range(0x10000)))
+
+
+_astral_width = lru_cache(maxsize=4096)(_char_width)
+
+
+def char_width(char: str) -> int:
+    """
+    Returns the number of terminal columns of the char: 0 (combining marks,
+    format and control chars), 1 or 2 (East Asian wide and fullwidth chars).
+    """
+    code = ord(char)
+    return _bmp_widths()[code] if code < 0x10000 else _astral_width(code)
+
+
+def display_width(string: str) -> int:
+    """Returns the number of terminal columns of the string (see `char_width`)."""
+    if string.isascii() and string.isprintable():
+        return len(string)
+    widths = _bmp_widths()
+    if max(string) < "\U00010000":
+        return sum(map(widths.__getitem__, map(ord, string)))
+    return sum(widths[code] if code < 0x10000 else _astral_width(code) for code in map(ord, string))
+
+
+def fit_width(string: str, width: int) -> int:
+    """
+    Returns the length of the longest prefix of the string fitting in
+    `width` columns (zero-width chars following the last char included).
+    """
+    if string.isascii() and string.isprintable():
+        return max(0, min(width, len(string)))
+    widths, total = _bmp_widths(), 0
+    for index, code in enumerate(map(ord, string)):
+        total += widths[code] if code < 0x10000 else _astral_width(code)
+        if total > width:
+            return index
+    return len(string)
+
+
+# words and line breaks of `wrap_spans`
+_WRAP_TOKEN = re.compile(r"\S+|\n")
+# control chars, but line breaks, of ASCII
+_ASCII_CONTROL = re.compile(r"[\x00-\x09\x0b-\x1f\x7f]")
+
+
+@lru_cache(maxsize=64)
+def _wrap_pattern(width: int) -> re.Pattern[str]:
+    """
+    The longest line of at most `width` chars (with the indentation at the
+    start of a line) ending at the end of a word, else the first `width`
+    chars of a longer word, else a line break.
+    """
+    rest = f"(?:[^\\n]{{0,{width - 2}}}\\S)?" if width > 1 else ""
+    return re.compile(
+        rf"(?:^(?=[^\S\n]+\S)[^\n]{{0,{width - 1}}}\S|\S{rest})(?=\s|\Z)|\S{{{width}}}|\n",
+        re.MULTILINE,
+    )
+
+
+def wrap_spans(string: str, width: int) -> list[tuple[int, int]]:
+    """
+    Returns the spans of the lines of the string wrapped to `width` columns.
+
+    Lines are broken at whitespace (which is dropped at the break points)
+    and words wider than `width` are broken at `width`, starting on a new
+    line. The line breaks of the string are kept, and so is the indentation
+    at the start of its lines when it fits with the first word.
+    """
+    if width <= 0:
+        raise ValueError(f"invalid width {width!r} (must be > 0)")
+    spans: list[tuple[int, int]] = []
+    if string.isascii() and not _ASCII_CONTROL.search(string):  # widths are lengths: the regex finds the lines
+        has_line, paragraph_start = False, 0
+        for match in _wrap_pattern(width).finditer(string):
+            start, end = match.span()
+            if string[start] != "\n":
+                spans.append((start, end))
+                has_line = True
+                continue
+            if not has_line:
+                spans.append((paragraph_start, paragraph_start))
+            has_line, paragraph_start = False, end
+        return spans
+
+    line_start = line_end = line_width = None  # the current output line
+    paragraph_start = 0  # start of the current line of the string
+    for match in _WRAP_TOKEN.finditer(string):
+        start, end = match.span()
+        if match[0] == "\n":
+            spans.append((paragraph_start, paragraph_start) if line_start is None else (line_start, line_end))
+            line_start = None
+            paragraph_start = end
+            continue
+        word_width = display_width(string[start:end])
+        if line_start is not None:
+            gap_width = display_width(string[line_end:start])
+            if line_width + gap_width + word_width <= width:
+                line_end, line_width = end, line_width + gap_width + word_width
+                continue
+            spans.append((line_start, line_end))
+        elif start > paragraph_start and (indent := display_width(string[paragraph_start:start])) + word_width <= width:
+            start, word_width = paragraph_start, indent + word_width
+        while word_width > width:
+            cut = start + max(1, fit_width(string[start:end], width))
+            spans.append((start, cut))
+            start, word_width = cut, display_width(string[cut:end])
+        line_start, line_end, line_width = start, end, word_width
+    if line_start is not None:
+        spans.append((line_start, line_end))
+    return spans
+
+
 def clamp(value: int | float, min=-float("inf"), max=float("inf")) -> int | float:
     return min if value < min else max if value > max else value
 
@@ -67,6 +397,93 @@ def hsl_to_rgb(hue: int | float, saturation: int = 100, lightness: int = 50) ->
     return f(0), f(8), f(4)
 
 
+def hsl_to_rgb_many(
+    hues: Sequence[int | float], saturation: int = 100, lightness: int = 50
+) -> tuple[list[int], list[int], list[int]]:
+    """
+    `hsl_to_rgb` for many hues at once, returned as (reds, greens, blues)
+    columns (vectorized if NumPy is installed).
+    """
+    if numpy is None or len(hues) < VECTORIZE_THRESHOLD:
+        colors = [hsl_to_rgb(hue, saturation, lightness) for hue in hues]
+        return [c[0] for c in colors], [c[1] for c in colors], [c[2] for c in colors]
+    hue = numpy.asarray(hues, dtype=float) / 100
+    saturation = saturation / 100
+    lightness = lightness / 100
+    a = saturation * min(lightness, 1 - lightness)
+
+    def f(n: int | float):
+        k = (n + hue * (10 / 3)) % 12
+        return numpy.rint(
+            (lightness - a * numpy.clip(numpy.minimum(k - 3, 9 - k), -1, 1)) * 255
+        ).astype(int).tolist()
+
+    return f(0), f(8), f(4)
+
+
+def rainbow_hues(length: int, offset: int = 0) -> list[int]:
+    """
+    Returns the integer hues (0-360) of `length` evenly spread rainbow
+    steps, shifted by `offset` degrees (vectorized if NumPy is installed).
+    """
+    if numpy is None or length < VECTORIZE_THRESHOLD:
+        hues = [round(index / length * 360) for index in range(length)]
+    else:
+        hues = numpy.rint(numpy.arange(length) / length * 360).astype(int).tolist()
+    if offset:
+        hues = [(hue + offset) % 360 for hue in hues]
+    return hues
+
+
+class HueStyles(NamedTuple):
+    """Pre-formatted SGR escape sequences of a hue."""
+
+    fg: str
+    bg: str
+    ul: str
+
+
+def _hue_styles(hue: int) -> HueStyles:
+    r, g, b = hsl_to_rgb(hue)
+    return HueStyles(*(
+        f"\x1b[{parameter};2;{r};{g};{b}m"
+        for parameter in (Foreground.SET, Background.SET, Underline.SET)
+    ))
+
+
+# Escape sequences of every integer hue (0-360) for rainbow-like coloring
+HUE_STYLES = tuple(_hue_styles(hue) for hue in range(361))
+
+
+def accumulate(
+    value: int | float, step: int | float, count: int,
+    min=-float("inf"), max=float("inf"),
+) -> Sequence[float]:
+    """
+    Returns `count` values, each one being the previous value (starting with
+    `value`) plus `step`, clamped to [min, max] (vectorized if NumPy is installed).
+    """
+    first = clamp(value + step, min, max)
+    if numpy is None or count < VECTORIZE_THRESHOLD or not min <= max:
+        values = [first]
+        for _ in range(count - 1):
+            first = clamp(first + step, min, max)
+            values.append(first)
+        return values[:count]
+    # The sequence is monotonic, so clamping the running sum (added in the
+    # same order as above) gives exactly the same floats.
+    values = numpy.full(count, step, dtype=float)
+    values[0] = first
+    return numpy.clip(numpy.cumsum(values), min, max)
+
+
+def to_channel(values: Sequence[int | float]) -> list[int]:
+    """Converts values to 0-255 color channels (vectorized if NumPy is installed)."""
+    if numpy is None or len(values) < VECTORIZE_THRESHOLD:
+        return [0 if value < 0 else 255 if value > 255 else int(value) for value in values]
+    return numpy.clip(values, 0, 255).astype(int).tolist()
+
+
 @dataclass
 class ValueRange:
     lo: int
@@ -82,3 +499,30 @@ class Length:
 
     def __hash__(self) -> int:
         return hash(self.value)
+
+
+def rgb_sgr_many(
+    parameter: int, reds: Sequence[int], greens: Sequence[int], blues: Sequence[int]
+) -> list[str]:
+    """
+    Returns the "parameter;2;r;g;b" SGR escape sequences of many colors,
+    formatting every distinct color once (vectorized if NumPy is installed).
+    """
+    if numpy is None or len(reds) < VECTORIZE_THRESHOLD:
+        cache = {}
+        return [
+            cache[color] if color in cache
+            else cache.setdefault(color, f"\x1b[{parameter};2;{color[0]};{color[1]};{color[2]}m")
+            for color in zip(reds, greens, blues)
+        ]
+    keys = (
+        numpy.asarray(reds, dtype=numpy.int64) << 16
+        | numpy.asarray(greens, dtype=numpy.int64) << 8
+        | numpy.asarray(blues, dtype=numpy.int64)
+    )
+    unique, inverse = numpy.unique(keys, return_inverse=True)
+    formatted = numpy.array(
+        [f"\x1b[{parameter};2;{key >> 16};{key >> 8 & 255};{key & 255}m" for key in unique.tolist()],
+        dtype=object,
+    )
+    return formatted[inverse.reshape(-1)].tolist()
@@ -0,0 +1,178 @@
+__all__ = [
+    "Highlighter",
+]
+
+import re
+from collections.abc import Generator, Iterable, Mapping
+from typing import Any, Self
+
+from pyansistring.pyansistring import ANSIString
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+# `re` flags that can be scoped to a group of the combined pattern
+_SCOPED_FLAGS = {
+    re.ASCII: "a",
+    re.IGNORECASE: "i",
+    re.MULTILINE: "m",
+    re.DOTALL: "s",
+    re.VERBOSE: "x",
+}
+# Leading global inline flags, such as "(?i)", turned into scoped flags
+_GLOBAL_FLAGS = re.compile(r"\A(?:\(\?[aiLmsux]+\))+")
+
+
+def _group_references(node: Any) -> Generator[int]:
+    """Yields the group numbers of the backreferences and conditionals of a parsed pattern, in order."""
+    if isinstance(node, (list, tuple, sre_parse.SubPattern)):
+        if len(node) == 2 and node[0] is sre_parse.GROUPREF:
+            yield node[1]
+        elif len(node) == 2 and node[0] is sre_parse.GROUPREF_EXISTS:
+            yield node[1][0]
+        for child in node:
+            yield from _group_references(child)
+
+
+class Highlighter:
+    r"""
+    Applies many pattern -> style rules to strings in a single regex scan.
+
+    All rules are combined into one alternation, each wrapped in its own
+    group, so a string is scanned once whatever the number of rules, and
+    all the matches are added to its styles in one update.
+
+    Priority and overlaps: matches never overlap. The scan picks the leftmost
+    match; when several rules match at the same index, the rule added first
+    wins (even if another one would match a longer text). Empty matches
+    style nothing.
+
+    Since the rules share one pattern, group names must be unique across
+    rules and groups can only be referred to by name (`(?P=name)`,
+    `(?(name)...)`). Leading global inline flags (as in `"(?i)error"`) apply
+    to their rule only.
+
+    Usage:
+        >>> highlighter = Highlighter([
+        ...     (f"{Foreground.SET};2;255;0;0", r"\bERROR\b"),
+        ...     ({"key": SGR.BOLD, "value": Foreground.CYAN}, r"(?P<key>\w+)=(?P<value>\S+)"),
+        ... ])
+        >>> highlighter.add_words(SGR.UNDERLINE, "GET", "POST")
+        >>> print(highlighter("ERROR user=alice GET /"))
+    """
+
+    def __init__(
+        self,
+        rules: Iterable[
+            tuple[int | str | Mapping, str | re.Pattern[str]]
+            | tuple[int | str | Mapping, str | re.Pattern[str], int]
+        ] = (),
+    ) -> None:
+        # (pattern source, flags, group -> style), in priority order
+        self._rules: list[tuple[str, int, dict[int | str, str]]] = []
+        self._group_names: set[str] = set()
+        self._scanner: tuple[re.Pattern[str], dict[int, tuple[tuple[int, str], ...]]] | None = None
+        for rule in rules:
+            self.add(*rule)
+
+    def add(
+        self,
+        parameter: int | str | Mapping[int | str, int | str],
+        pattern: str | re.Pattern[str],
+        flags: int = 0,
+    ) -> Self:
+        """
+        Adds a rule styling the matches of the pattern with the SGR parameter
+        or, with a mapping, each group (number or name) with its parameter.
+        """
+        if isinstance(pattern, re.Pattern):
+            if flags:
+                raise ValueError("cannot process flags argument with a compiled pattern")
+            pattern, flags = pattern.pattern, pattern.flags & ~re.UNICODE
+        unsupported = flags & ~sum(_SCOPED_FLAGS) & ~re.UNICODE
+        if unsupported:
+            raise ValueError(f"unsupported flags for a highlighter rule: {re.RegexFlag(unsupported)!r}")
+        compiled = re.compile(pattern, flags)  # raises for an invalid pattern right away
+        flags = compiled.flags & ~re.UNICODE  # with the inline global flags
+        pattern = _GLOBAL_FLAGS.sub("", pattern)
+        for name in compiled.groupindex:
+            if name in self._group_names:
+                raise re.error(f"redefinition of group name {name!r} (group names are shared by all rules)")
+        references = tuple(_group_references(sre_parse.parse(pattern, flags)))
+        if references:
+            # behind one more group, named references shift and numeric ones do not
+            shifted = _group_references(sre_parse.parse(f"(){pattern}", flags))
+            if any(map(int.__eq__, references, shifted)):
+                raise ValueError("numeric group references are not supported in highlighter rules, use named groups")
+        if not isinstance(parameter, Mapping):
+            parameter = {0: parameter}
+        for group in parameter:
+            if group not in compiled.groupindex and group not in range(compiled.groups + 1):
+                raise IndexError(f"no such group: {group!r}")
+        styles = {group: f"\x1b[{value}m" for group, value in parameter.items()}
+        self._rules.append((pattern, flags, styles))
+        try:
+            self._compile()  # a rule breaking the combined pattern is not added
+        except re.error:
+            self._rules.pop()
+            self._scanner = None
+            raise
+        self._group_names.update(compiled.groupindex)
+        return self
+
+    def add_words(
+        self, parameter: int | str | Mapping[int | str, int | str], *words: str,
+        case_sensitive: bool = True,
+    ) -> Self:
+        """Adds a rule styling the words (as the `*_w` methods of `ANSIString`)."""
+        return self.add(
+            parameter,
+            "|".join(map(re.escape, words)),
+            0 if case_sensitive else re.IGNORECASE,
+        )
+
+    def _compile(self) -> tuple[re.Pattern[str], dict[int, tuple[tuple[int, str], ...]]]:
+        alternatives, styles_by_group, group = [], {}, 1
+        for pattern, flags, styles in self._rules:
+            compiled = re.compile(pattern, flags)
+            letters = "".join(letter for flag, letter in _SCOPED_FLAGS.items() if flags & flag)
+            if flags & re.VERBOSE:  # a trailing comment must not swallow the parentheses
+                pattern += "\n"
+            alternatives.append(f"(?{letters}:({pattern}))" if letters else f"({pattern})")
+            styles_by_group[group] = tuple(
+                (group + (compiled.groupindex[name] if isinstance(name, str) else name), style)
+                for name, style in styles.items()
+            )
+            group += 1 + compiled.groups
+        self._scanner = (re.compile("|".join(alternatives)), styles_by_group)
+        return self._scanner
+
+    def highlight(self, string: str | ANSIString) -> ANSIString:
+        """
+        Styles the matches of all rules in the string and returns it (a new
+        `ANSIString` for a `str`, the same one for an `ANSIString`).
+        """
+        if not isinstance(string, ANSIString):
+            string = ANSIString(string)
+        if not self._rules:
+            return string
+        pattern, styles_by_group = self._scanner or self._compile()
+        additions: dict[int, str] = {}
+        for match in pattern.finditer(string.plain):
+            if match.start() == match.end():
+                continue
+            for group, style in styles_by_group[match.lastindex]:
+                for index in range(*match.span(group)):
+                    additions[index] = additions.get(index, "") + style
+        string._extend_styles(additions)
+        return string
+
+    __call__ = highlight
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def __repr__(self) -> str:
+        return f"Highlighter(<{len(self._rules)} rules>)"
@@ -0,0 +1,183 @@
+__all__ = [
+    "Formatter",
+    "StreamHandler",
+]
+
+import logging
+import os
+import re
+import threading
+from collections.abc import Mapping, Sequence
+from typing import IO, Any, Literal
+
+from pyansistring.constants import SGR, Foreground
+from pyansistring.palette import downgrade_style
+
+RESET = "\x1b[0m"
+
+DEFAULT_LEVEL_STYLES: dict[int, tuple[int | str, ...]] = {
+    logging.DEBUG: (Foreground.BRIGHT_BLACK,),
+    logging.INFO: (Foreground.GREEN,),
+    logging.WARNING: (Foreground.YELLOW,),
+    logging.ERROR: (Foreground.RED,),
+    logging.CRITICAL: (Foreground.RED, SGR.BOLD),
+}
+
+_STYLES = {
+    "%": logging.PercentStyle,
+    "{": logging.StrFormatStyle,
+    "$": logging.StringTemplateStyle,
+}
+# A field of the format string, with its conversion and format spec
+_FIELD_PATTERNS = {
+    "%": re.compile(r"%\((?P<field>\w+)\)[#0+ -]*(?:\*|\d+)?(?:\.(?:\*|\d+))?[diouxefgcrsa]", re.I),
+    "{": re.compile(r"(?<!\{)\{(?P<field>\w+)(?:![rsa])?(?::[^{}]*)?\}"),
+    "$": re.compile(r"(?<!\$)\$(?:(?P<field>\w+)|\{(?P<braced>\w+)\})"),
+}
+
+
+def _escape(parameters: int | str | Sequence[int | str], color_depth: int) -> str:
+    if isinstance(parameters, (int, str)):
+        parameters = (parameters,)
+    return downgrade_style("".join(f"\x1b[{parameter}m" for parameter in parameters), color_depth)
+
+
+class Formatter(logging.Formatter):
+    r"""
+    A `logging.Formatter` styling fields of the format string, some by the
+    level of the record (`levelname` by default) and others with a fixed style.
+
+    The format string of every level is compiled once, with the escape
+    sequences spliced around its styled fields, so formatting a record costs
+    the same string formatting operation as with `logging.Formatter`.
+
+    With `use_color=False`, records are formatted without styles. By default
+    (`use_color=None`), a `StreamHandler` using the formatter decides from its
+    stream (styled on a terminal), and records are styled otherwise.
+
+    Usage:
+        >>> formatter = Formatter(
+        ...     "%(asctime)s %(levelname)-8s %(name)s: %(message)s",
+        ...     field_styles={"asctime": SGR.DIM, "name": Foreground.BLUE},
+        ... )
+        >>> handler = StreamHandler()
+        >>> handler.setFormatter(formatter)
+        >>> logging.getLogger().addHandler(handler)
+    """
+
+    def __init__(
+        self,
+        fmt: str | None = None,
+        datefmt: str | None = None,
+        style: Literal["%", "{", "$"] = "%",
+        validate: bool = True,
+        *,
+        defaults: Mapping[str, Any] | None = None,
+        level_styles: Mapping[int, int | str | Sequence[int | str]] | None = None,
+        level_fields: Sequence[str] = ("levelname",),
+        field_styles: Mapping[str, int | str | Sequence[int | str]] | None = None,
+        use_color: bool | None = None,
+        color_depth: Literal[24, 8, 4, 0] = 24,
+    ) -> None:
+        super().__init__(fmt, datefmt, style, validate, defaults=defaults)
+        self.use_color = use_color
+        self._field_escapes = {
+            field: _escape(parameters, color_depth)
+            for field, parameters in (field_styles or {}).items()
+        }
+        # (levelno, escape), sorted by levelno
+        self._level_escapes = sorted(
+            (levelno, _escape(parameters, color_depth))
+            for levelno, parameters in (DEFAULT_LEVEL_STYLES if level_styles is None else level_styles).items()
+        )
+        self._level_fields = frozenset(level_fields)
+        self._defaults = defaults
+        self._colored_styles: dict[int, logging.PercentStyle] = {}
+        self._local = threading.local()  # `use_color` of the current `format` call
+
+    def _escape_for(self, levelno: int) -> str:
+        """Returns the escape of the highest styled level not above `levelno`."""
+        escape = ""
+        for styled, level_escape in self._level_escapes:
+            if styled > levelno:
+                break
+            escape = level_escape
+        return escape
+
+    def _compile(self, levelno: int) -> logging.PercentStyle:
+        """Compiles the format string of the level with the styles spliced around its fields."""
+        style_char = next(char for char, style in _STYLES.items() if type(self._style) is style)
+        level_escape = self._escape_for(levelno)
+
+        def splice(match: re.Match[str]) -> str:
+            field = match["field"] or match.groupdict().get("braced")
+            escape = level_escape if field in self._level_fields else self._field_escapes.get(field, "")
+            return f"{escape}{match[0]}{RESET}" if escape else match[0]
+
+        fmt = _FIELD_PATTERNS[style_char].sub(splice, self._style._fmt)
+        compiled = _STYLES[style_char](fmt, defaults=self._defaults)
+        self._colored_styles[levelno] = compiled
+        return compiled
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        use_color = getattr(self._local, "use_color", None)
+        if use_color is None:
+            use_color = self.use_color is not False
+        if not use_color:
+            return self._style.format(record)
+        style = self._colored_styles.get(record.levelno) or self._compile(record.levelno)
+        return style.format(record)
+
+    def format(self, record: logging.LogRecord, use_color: bool | None = None) -> str:
+        """
+        Formats the record as `logging.Formatter.format`, with styles unless
+        `use_color` (`self.use_color` if `None`) is false.
+        """
+        if use_color is None:
+            return super().format(record)
+        previous, self._local.use_color = getattr(self._local, "use_color", None), use_color
+        try:
+            return super().format(record)
+        finally:
+            self._local.use_color = previous
+
+
+_DEFAULT_FORMATTER = Formatter("%(levelname)s:%(name)s:%(message)s")
+
+
+class StreamHandler(logging.StreamHandler):
+    """
+    A `logging.StreamHandler` formatting records with styles only when the
+    stream is a terminal (and the `NO_COLOR` environment variable is not
+    set), unless `use_color` forces it either way. A `Formatter` with its own
+    `use_color` keeps it.
+
+    Records are formatted with a `Formatter` when none is set.
+    """
+
+    def __init__(self, stream: IO[str] | None = None, use_color: bool | None = None) -> None:
+        super().__init__(stream)
+        self._use_color = use_color
+        self.colored = self._detect()
+
+    def _detect(self) -> bool:
+        if self._use_color is not None:
+            return self._use_color
+        if os.environ.get("NO_COLOR"):
+            return False
+        isatty = getattr(self.stream, "isatty", None)
+        try:
+            return bool(isatty and isatty())
+        except ValueError:  # closed stream
+            return False
+
+    def setStream(self, stream: IO[str]) -> IO[str] | None:
+        result = super().setStream(stream)
+        self.colored = self._detect()
+        return result
+
+    def format(self, record: logging.LogRecord) -> str:
+        formatter = self.formatter or _DEFAULT_FORMATTER
+        if isinstance(formatter, Formatter) and formatter.use_color is None:
+            return formatter.format(record, self.colored)
+        return super().format(record)
@@ -0,0 +1,117 @@
+__all__ = [
+    "XTERM_COLORS",
+    "COLORS_8B_TO_4B",
+    "rgb_to_8b",
+    "color_8b_to_4b",
+    "downgrade_style",
+]
+
+from functools import lru_cache
+from typing import Literal
+
+from pyansistring.constants import Background, Foreground, Underline
+
+# RGB values of the xterm 256-color palette:
+# 16 system colors, a 6x6x6 color cube and 24 grays
+_SYSTEM_COLORS = (
+    (0, 0, 0), (205, 0, 0), (0, 205, 0), (205, 205, 0),
+    (0, 0, 238), (205, 0, 205), (0, 205, 205), (229, 229, 229),
+    (127, 127, 127), (255, 0, 0), (0, 255, 0), (255, 255, 0),
+    (92, 92, 255), (255, 0, 255), (0, 255, 255), (255, 255, 255),
+)
+_CUBE_LEVELS = (0, 95, 135, 175, 215, 255)
+XTERM_COLORS: tuple[tuple[int, int, int], ...] = (
+    _SYSTEM_COLORS
+    + tuple((r, g, b) for r in _CUBE_LEVELS for g in _CUBE_LEVELS for b in _CUBE_LEVELS)
+    + tuple((level, level, level) for level in range(8, 248, 10))
+)
+
+# Nearest color cube level of every channel value
+_CUBE_INDEX = bytes(
+    min(range(6), key=lambda level: abs(_CUBE_LEVELS[level] - value)) for value in range(256)
+)
+
+
+def _distance(a: tuple[int, int, int], b: tuple[int, int, int]) -> int:
+    return (a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 + (a[2] - b[2]) ** 2
+
+
+@lru_cache(maxsize=65536)
+def rgb_to_8b(r: int, g: int, b: int) -> int:
+    """Returns the nearest color of the xterm 256-color palette (cube or grays)."""
+    cube = 16 + 36 * _CUBE_INDEX[r] + 6 * _CUBE_INDEX[g] + _CUBE_INDEX[b]
+    gray = 232 + min(23, max(0, ((r + g + b) // 3 - 3) // 10))
+    rgb = (r, g, b)
+    if _distance(XTERM_COLORS[gray], rgb) < _distance(XTERM_COLORS[cube], rgb):
+        return gray
+    return cube
+
+
+# Nearest system color (0-15) of every color of the 256-color palette
+COLORS_8B_TO_4B = bytes(
+    index if index < 16 else min(range(16), key=lambda system: _distance(_SYSTEM_COLORS[system], rgb))
+    for index, rgb in enumerate(XTERM_COLORS)
+)
+
+
+def color_8b_to_4b(color: int, base: Literal[Foreground.BLACK, Background.BLACK]) -> int:
+    """Returns the 4-bit SGR parameter (e.g. 31 or 91 for red foreground) of the 8-bit color."""
+    system = COLORS_8B_TO_4B[color]
+    return base + system if system < 8 else base + 60 + system - 8
+
+
+_COLOR_SETS = {str(Foreground.SET), str(Background.SET), str(Underline.SET)}
+_BASES = {str(Foreground.SET): Foreground.BLACK, str(Background.SET): Background.BLACK}
+# 4-bit and default colors, dropped without colors
+_COLOR_PARAMETERS = {
+    str(code)
+    for enum in (Foreground, Background, Underline)
+    for code in enum
+    if code not in (Foreground.SET, Background.SET, Underline.SET)
+}
+
+
+def _downgrade_parameters(parameters: list[str], color_depth: int) -> list[str]:
+    result, index = [], 0
+    while index < len(parameters):
+        parameter = parameters[index]
+        mode = parameters[index + 1] if index + 1 < len(parameters) else None
+        if parameter not in _COLOR_SETS or mode not in ("2", "5"):
+            if not (color_depth == 0 and parameter in _COLOR_PARAMETERS):
+                result.append(parameter)
+            index += 1
+            continue
+
+        size = 5 if mode == "2" else 3
+        values = parameters[index + 2:index + size]
+        index += size
+        if color_depth == 0:
+            continue
+        elif color_depth == 24 or color_depth == 8 and mode == "5":
+            result.extend((parameter, mode, *values))
+            continue
+        color = int(values[0]) if mode == "5" else rgb_to_8b(*map(int, values))
+        if color_depth == 8:
+            result.extend((parameter, "5", str(color)))
+        elif parameter in _BASES:  # there are no 4-bit underline colors
+            result.append(str(color_8b_to_4b(color, _BASES[parameter])))
+    return result
+
+
+@lru_cache(maxsize=4096)
+def downgrade_style(style: str, color_depth: Literal[24, 8, 4, 0]) -> str:
+    """
+    Converts the colors of the ANSI escape sequences of the style to the
+    color depth: 24-bit (unchanged), 8-bit (256 colors), 4-bit (16 colors)
+    or 0 (no colors); other parameters (bold, italic, ...) are kept.
+    """
+    if color_depth not in (24, 8, 4, 0):
+        raise ValueError(f"unsupported color depth ({color_depth=}, expected 24, 8, 4 or 0)")
+    elif color_depth == 24:
+        return style
+    escapes = []
+    for sequence in style.split("\x1b[")[1:]:
+        parameters = _downgrade_parameters(sequence.removesuffix("m").split(";"), color_depth)
+        if parameters:
+            escapes.append(f"\x1b[{';'.join(parameters)}m")
+    return "".join(escapes)
@@ -1,156 +1,738 @@
 __all__ = [
     "StyleDict",
+    "FrozenStyleDict",
+    "MulticolorProgram",
     "ANSIString",
+    "FrozenANSIString",
+    "RenderCache",
+    "RenderCacheInfo",
+    "enable_render_cache",
+    "disable_render_cache",
 ]
 
+import io
+import os
 import re
-from collections.abc import Generator, Hashable, Sequence
-from copy import copy, deepcopy
-from functools import wraps
-from itertools import cycle
-from random import randint
-from types import MethodType
-from typing import Annotated, Any, Callable, Literal, Self
+import sys
+from bisect import bisect_left
+from collections import OrderedDict
+from collections.abc import Generator, Hashable, Iterable, Mapping, Sequence
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache, partial
+from itertools import chain, count, groupby, islice
+from operator import add, ne
+from random import Random, randint
+from threading import Lock
+from typing import IO, Annotated, Any, Callable, Literal, NamedTuple, Self
 
 from pyansistring.constants import *
 from pyansistring.helpers import *
+from pyansistring.palette import downgrade_style
 
 
-def _wrapper_has_been_modified(method: Callable, bound: bool = False):
-    @wraps(method)
-    def wrapped(self: "StyleDict", *args, **kwargs):
-        previous_length = len(self)
-        if not bound:
-            result = method(self, *args, **kwargs)
-        else:
-            result = method(*args, **kwargs)
-        if not self._has_been_modified and previous_length != len(self):
-            self._has_been_modified = True
-        return result
-
-    return wrapped
+# Version stamps of `StyleDict`s: unique and increasing across all of them
+# (`next` on a `count` is atomic, so concurrent writers never share a stamp)
+_STYLE_VERSIONS = count(1)
 
 
 class StyleDict(dict):
     """
     A dictionary subclass for storing and tracking changes to styles.
 
+    Every modification gives the dictionary a new version stamp, taken after
+    the change, so a render computed from a version read before it is never
+    stale: caches keyed on `version` are safe for concurrent readers.
+
     Instance Attributes:
-        _has_been_modified: A boolean indicating whether the styles have
-        been modified since the last check.
+        _version: the version stamp of the current content.
+        _checked_version: the version seen by the last `has_been_modified` check.
 
     Properties:
-        has_been_modified: A getter for `_has_been_modified`
+        version: a getter for `_version`.
+        has_been_modified: whether the styles have been modified since the
+        last check (each check resets it).
 
     Usage:
         >>> style_dict = StyleDict()
+        >>> version = style_dict.version
         >>> style_dict[key] = value
+        >>> style_dict.version != version  # returns True
         >>> style_dict.has_been_modified  # returns True
         >>> style_dict.has_been_modified  # returns False
     """
 
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
-        self._has_been_modified = False
-        for name in {"clear", "pop", "popitem", "setdefault", "update"}:
-            setattr(
-                self, name,
-                MethodType(_wrapper_has_been_modified(getattr(self, name), bound=True), self),
-            )
+        self._version = self._checked_version = next(_STYLE_VERSIONS)
+
+    def _bump(self) -> None:
+        """Stamps a new version (after a modification)."""
+        self._version = next(_STYLE_VERSIONS)
+
+    @property
+    def version(self) -> int:
+        return self._version
 
     @property
     def has_been_modified(self) -> bool:
-        result = self._has_been_modified
-        if self._has_been_modified:
-            self._has_been_modified = False
-        return result
+        version, checked, self._checked_version = self._version, self._checked_version, self._version
+        return version != checked
 
     def __repr__(self) -> str:
         return f"StyleDict({dict.__repr__(self)})"
 
     def __setitem__(self, key: Hashable, value: Any) -> None:
-        if isinstance(key, Hashable):
-            self._has_been_modified = True
-        return super().__setitem__(key, value)
+        super().__setitem__(key, value)
+        self._bump()
 
-    @_wrapper_has_been_modified
     def __delitem__(self, key: Any) -> None:
-        return super().__delitem__(key)
+        super().__delitem__(key)
+        self._bump()
+
+    def __ior__(self, other: Any) -> Self:
+        super().__ior__(other)
+        self._bump()
+        return self
+
+    def clear(self) -> None:
+        super().clear()
+        self._bump()
+
+    def pop(self, *args: Any) -> Any:
+        value = super().pop(*args)
+        self._bump()
+        return value
+
+    def popitem(self) -> tuple[Any, Any]:
+        item = super().popitem()
+        self._bump()
+        return item
+
+    def setdefault(self, key: Hashable, default: Any = None) -> Any:
+        value = super().setdefault(key, default)
+        self._bump()
+        return value
+
+    def update(self, *args, **kwargs) -> None:
+        super().update(*args, **kwargs)
+        self._bump()
+
+    def __reduce__(self) -> tuple:
+        # version stamps are only unique within a process: a new one is taken
+        return type(self), (dict(self),)
 
     def copy(self) -> "StyleDict":
         copied = StyleDict(dict.copy(self))
-        copied._has_been_modified = self._has_been_modified
+        if self._checked_version != self._version:
+            copied._checked_version = 0
         return copied
 
 
-class MulticolorInstruction:
-    color: str
-    operator: str
-    value: str
-    processed_value: int | float
-    mode: str
-    minmax: tuple[float, float]
-    repeat: int
-
-    def __init__(self, rgb: dict[str, dict[str, int]], **kwargs) -> None:
-        allowed_keys = {"color", "operator", "value", "mode", "minmax", "repeat"}
-        missing_keys = tuple(k for k in allowed_keys if k not in kwargs)
-        if not kwargs or len(missing_keys):
-            raise TypeError(
-                f"{self.__class__}.__init__() missing {len(missing_keys)}"
-                f" required keyword argument{'s' if len(missing_keys)>1 else ''}:"
-                ", ".join(missing_keys)
+class FrozenStyleDict(StyleDict):
+    """An immutable `StyleDict` (its version never changes), used by `FrozenANSIString`."""
+
+    def _immutable(self, *args: Any, **kwargs: Any) -> Any:
+        raise TypeError("'FrozenStyleDict' object is immutable")
+
+    __setitem__ = __delitem__ = __ior__ = _immutable
+    clear = pop = popitem = setdefault = update = _immutable
+
+    def copy(self) -> StyleDict:
+        """Returns a mutable copy."""
+        return StyleDict(self)
+
+    def __repr__(self) -> str:
+        return f"FrozenStyleDict({dict.__repr__(self)})"
+
+
+_CHANNELS = {
+    (mode, color): no * 3 + offset
+    for no, mode in enumerate(("fg", "bg", "ul"))
+    for offset, color in enumerate("rgb")
+}
+
+
+class MulticolorProgram:
+    """
+    A multicolor sequence (see `MulticolorSequences`) parsed once and
+    reusable for any number of strings and slices.
+
+    Instance Attributes:
+        sequence: the source sequence text.
+        flags: mapping of "skipfirst", "cycle", "reverse" and "mirror" to 0 or 1.
+        start: parsed instructions of the start command (or `None` without "$").
+        commands: tuples of (instructions, reset, repeat), where repeat is
+        an int, "auto" or `None` (once, not counted against "auto").
+
+    Evaluation works on a flat state of 9 channels (r, g, b for fg, bg, ul):
+    every command is resolved once into immutable steps, and repeats, reverse,
+    mirror and cycle only reorder references to these steps.
+
+    Usage:
+        >>> program = MulticolorProgram.compile(MulticolorSequences.RAINBOW)
+        >>> ANSIString("Hello, World!").multicolor(program)
+        >>> program.apply(ANSIString("Hello again!"))
+        >>> program.trajectory(13)  # [(fg, bg), ...] per slice
+    """
+
+    __slots__ = ("sequence", "flags", "start", "commands")
+
+    CHAR_TO_FLAG = {
+        "*": "skipfirst",
+        "&": "cycle",
+        "@": "reverse",
+        "!": "mirror",
+    }
+
+    def __init__(self, sequence: str) -> None:
+        self.sequence = sequence
+        self.flags = {flag: 0 for flag in self.CHAR_TO_FLAG.values()}
+
+        offset = 0
+        for char in reversed(sequence):
+            if char in self.CHAR_TO_FLAG:
+                self.flags[self.CHAR_TO_FLAG[char]] = 1
+                offset -= 1
+            elif char == " ":
+                offset -= 1
+            else:
+                break
+        if offset:
+            sequence = sequence[:offset]
+
+        self.start = None
+        if "$" in sequence:
+            start_command, sequence = map(str.strip, sequence.split("$"))
+            self.start = self._parse_instructions(start_command)
+
+        commands = []
+        for command in map(str.strip, sequence.split("#")):
+            match_command = re.search(Regex.MULTICOLOR_COMMAND, command)
+            repeat = match_command["repeat"]
+            if repeat and repeat != "auto":
+                repeat = int(repeat)
+            commands.append(
+                (self._parse_instructions(command), match_command["reset"], repeat)
+            )
+        self.commands = tuple(commands)
+
+    @staticmethod
+    def _parse_instructions(command: str) -> tuple[tuple, ...]:
+        """
+        Parses instructions into (channel, operator, kind, value, min, max),
+        where kind is "const", "random" (value is a range) or "var"
+        (value is a channel).
+        """
+        instructions = []
+        for instruction in map(str.strip, command.split("|")):
+            match_instruction = re.match(Regex.MULTICOLOR_INSTRUCTION, instruction)
+            if not match_instruction:
+                continue
+            channel = _CHANNELS[match_instruction["mode"] or "fg", match_instruction["color"]]
+            value = match_instruction["value"]
+            if value.startswith("random"):
+                kind, value = "random", tuple(map(int, value[7:-1].split(",")))
+            elif value.endswith(("r", "g", "b")):
+                kind, value = "var", _CHANNELS[tuple(value.split("_"))]
+            else:
+                kind, value = "const", float(value)
+            if match_instruction["minmax"]:
+                minmax = tuple(map(float, match_instruction["minmax"][7:-1].split(",")))
+            else:
+                minmax = (0, 255)
+            instructions.append(
+                (channel, match_instruction["operator"], kind, value, *minmax)
             )
+        return tuple(instructions)
 
-        self.rgb = rgb
-        for k, v in kwargs.items():
-            setattr(self, k, v)
-        self.processed_value = self.process_value(self.value)
-
-        if isinstance(self.minmax, str):
-            self.minmax = tuple(map(float, self.minmax[7:-1].split(",")))
-        elif self.minmax is None:
-            self.minmax = (0, 255)
-
-        if not self.mode:
-            self.mode = "fg"
-
-        if self.operator == ">":
-            base_value = rgb[self.mode][self.color]
-            if base_value <= self.processed_value:
-                self.operator = "+"
-                self.processed_value = (self.processed_value - base_value) / self.repeat
-            elif base_value > self.processed_value:
-                self.operator = "-"
-                self.processed_value = (base_value - self.processed_value) / self.repeat
-
-    def process_value(self, value: str, save: bool = False) -> int | float:
-        if value.startswith("random"):
-            from_value, to_value = map(int, value[7:-1].split(","))
-            value = randint(from_value, to_value)
-        elif value.endswith(("r", "g", "b")):
-            mode, color = value.split("_")
-            value = self.rgb[mode][color]
+    @staticmethod
+    def compile(sequence: "str | MulticolorProgram") -> "MulticolorProgram":
+        """Returns the (cached) compiled program of the sequence."""
+        if isinstance(sequence, MulticolorProgram):
+            return sequence
+        return _compile_multicolor_program(sequence)
+
+    def resolve_repeats(self, length: int) -> tuple[int, ...]:
+        """Resolves "auto" repeats of the commands for `length` steps."""
+        auto_length, auto_count = length, 0
+        repeats = []
+        for _, _, repeat in self.commands:
+            if repeat is None:
+                repeat = 1
+            elif repeat == "auto":
+                auto_count += 1
+            else:
+                repeat = min(repeat, max(auto_length, 0))
+                auto_length -= repeat
+            repeats.append(repeat)
+        for index, repeat in enumerate(repeats):
+            if repeat == "auto":
+                value = -(auto_length // -auto_count)
+                auto_length -= value
+                auto_count -= 1
+                repeats[index] = value
+        return tuple(repeats)
+
+    @staticmethod
+    def _resolve(
+        instructions: tuple, state: list, repeat: int = 1, draw: Callable = randint
+    ) -> tuple:
+        """
+        Resolves parsed instructions against the current state into a step:
+        (instructions as (channel, operator, value, min, max), fg/bg modes,
+        parsed instructions to redraw on cycle or `None`).
+        """
+        resolved, volatile = [], False
+        for channel, operator, kind, value, lo, hi in instructions:
+            if kind == "random":
+                value = draw(*value)
+                volatile = volatile or operator != ">"
+            elif kind == "var":
+                value = state[value]
+            if operator == ">":
+                base_value = state[channel]
+                if base_value <= value:
+                    operator, value = "+", (value - base_value) / repeat
+                else:
+                    operator, value = "-", (base_value - value) / repeat
+            resolved.append((channel, operator, value, lo, hi))
+        modes = tuple(any(i[0] // 3 == no for i in resolved) for no in range(2))
+        return tuple(resolved), modes, instructions if volatile else None
+
+    @staticmethod
+    def _redraw(step: tuple, draw: Callable = randint) -> tuple:
+        """Returns a copy of the step with its random values drawn again."""
+        resolved, modes, instructions = step
+        if instructions is None:
+            return step
+        redrawn = tuple(
+            (channel, operator, draw(*parsed[3]), lo, hi)
+            if parsed[2] == "random" and parsed[1] != ">"
+            else (channel, operator, value, lo, hi)
+            for (channel, operator, value, lo, hi), parsed in zip(resolved, instructions)
+        )
+        return redrawn, modes, instructions
+
+    @classmethod
+    def _cycle(cls, runs: list, missing: int, draw: Callable = randint) -> list:
+        """Returns the runs that cycle `runs` for `missing` more steps."""
+        cycled = []
+        while runs and missing > 0:
+            for step, reset, flip, count in runs:
+                count = min(count, missing)
+                missing -= count
+                if step[2] is not None:
+                    cycled.extend((cls._redraw(step, draw), reset, flip, 1) for _ in range(count))
+                elif cycled and cycled[-1][:3] == (step, reset, flip):
+                    cycled[-1] = (step, reset, flip, cycled[-1][3] + count)
+                else:
+                    cycled.append((step, reset, flip, count))
+                if not missing:
+                    break
+        return cycled
+
+    @staticmethod
+    def _run(
+        state: list, start: list, step: tuple, reset: str | None, flip: bool = False
+    ) -> list[int | float]:
+        """Runs a step over the state and returns the displayed fg/bg channels."""
+        previous = state[:] if reset == "?" else None
+        for channel, operator, value, lo, hi in step[0]:
+            if operator == "=":
+                pass
+            elif (operator == "+") != flip:
+                value = state[channel] + value
+            else:
+                value = state[channel] - value
+            state[channel] = lo if value < lo else hi if value > hi else value
+        displayed = state[:6]
+        if reset == "?":
+            state[:] = previous
+        elif reset == "??":
+            state[:] = start
+        return displayed
+
+    def steps(
+        self, length: int, seed: int | Random | None = None
+    ) -> tuple[list, list, list[tuple[tuple, str | None, bool, int]], tuple]:
+        """
+        Resolves the program for `length` slices into (initial state, start
+        state, ordered runs of (step, reset, flip, count), start modes).
+        `seed` (an int or a `random.Random`) makes "random(x,y)" values
+        reproducible, otherwise the global `random` functions are used.
+        """
+        if seed is None:
+            draw = randint
         else:
-            value = float(value)
-        if save:
-            self.processed_value = value
-        return value
+            draw = (seed if isinstance(seed, Random) else Random(seed)).randint
+        flags = self.flags
+        state = [0] * 9
+        start_modes = (False, False)
+        if self.start is not None:
+            start_step = self._resolve(self.start, state, draw=draw)
+            self._run(state, state, start_step, None)
+            start_modes = start_step[1]
+        start = state[:]
+
+        slices_length = length - (1 if flags["skipfirst"] else 0)
+        runs: list[tuple[tuple, str | None, bool, int]] = []
+        for (instructions, reset, _), repeat in zip(
+            self.commands, self.resolve_repeats(slices_length)
+        ):
+            if repeat == 0:
+                continue
+            step = self._resolve(instructions, state, repeat, draw)
+            runs.append((step, reset, False, repeat))
+            self._run_many(state, start, step, reset, repeat, display=False)
+
+        state = start[:]
+        count = sum(run[3] for run in runs)
+        if flags["mirror"] and count > 1:
+            runs.extend([(step, reset, True, n) for step, reset, _, n in reversed(runs)])
+            count *= 2
+        elif flags["reverse"]:
+            if flags["cycle"] and count < slices_length:
+                runs.extend(self._cycle(runs, slices_length - count, draw))
+                count = slices_length
+            self._run_runs(state, start, runs, display=False)
+            runs = [(step, reset, True, n) for step, reset, _, n in reversed(runs)]
+        if flags["cycle"] and not flags["reverse"] and count < slices_length:
+            runs.extend(self._cycle(runs, slices_length - count, draw))
+        return state, start, runs, start_modes
 
+    @staticmethod
+    def _columns(
+        displayed: list[list[int | float]], modes: tuple[bool, bool]
+    ) -> tuple[tuple[list[int], ...] | None, tuple[list[int], ...] | None, int]:
+        """Converts displayed channels into (fg, bg, count) color columns."""
+        columns = [to_channel(channel) for channel in zip(*displayed)] or [[]] * 6
+        return (
+            tuple(columns[:3]) if modes[0] else None,
+            tuple(columns[3:]) if modes[1] else None,
+            len(displayed),
+        )
+
+    @classmethod
+    def _run_many(
+        cls, state: list, start: list, step: tuple, reset: str | None, count: int,
+        flip: bool = False, display: bool = True,
+    ) -> tuple | None:
+        """
+        Runs a step `count` times over the state and returns the displayed
+        (fg, bg, count) color columns (if `display`). Steps without reset
+        whose instructions do not depend on each other are computed per
+        channel at once (with NumPy, if it is installed), giving the same
+        colors as running them one by one.
+        """
+        channels = [instruction[0] for instruction in step[0]]
+        if count == 1 or reset is not None or len(set(channels)) != len(channels):
+            displayed = [cls._run(state, start, step, reset, flip) for _ in range(count)]
+            return cls._columns(displayed, step[1]) if display else None
+
+        columns = [None] * 6
+        for channel, operator, value, lo, hi in step[0]:
+            if operator == "=":
+                state[channel] = lo if value < lo else hi if value > hi else value
+                values = (state[channel],) * count
+            else:
+                if (operator == "+") == flip:
+                    value = -value
+                values = accumulate(state[channel], value, count, lo, hi)
+                state[channel] = float(values[-1])
+            if display and channel < 6:
+                columns[channel] = to_channel(values)
+        if not display:
+            return None
+        for channel, column in enumerate(columns):
+            if column is None:
+                columns[channel] = to_channel((state[channel],)) * count
+        return (
+            tuple(columns[:3]) if step[1][0] else None,
+            tuple(columns[3:]) if step[1][1] else None,
+            count,
+        )
 
-class MulticolorCommand:
-    def __init__(
+    @classmethod
+    def _run_runs(
+        cls, state: list, start: list, runs: list, display: bool = True
+    ) -> list[tuple]:
+        """Runs the ordered runs and returns their (fg, bg, count) color columns."""
+        return [
+            cls._run_many(state, start, step, reset, count, flip, display)
+            for step, reset, flip, count in runs
+        ]
+
+    def columns(
+        self, length: int, seed: int | Random | None = None
+    ) -> list[tuple[tuple[list[int], ...] | None, tuple[list[int], ...] | None, int]]:
+        """
+        Evaluates the program for `length` slices into segments of
+        (fg, bg, count), where fg and bg are (r, g, b) columns of `count`
+        colors each (or `None` where the slices are not colored).
+        """
+        state, start, runs, start_modes = self.steps(length, seed)
+        segments = []
+        if self.flags["skipfirst"] and length:
+            segments.append(self._columns([state[:6]], start_modes))
+            length -= 1
+        for step, reset, flip, count in runs:
+            if length <= 0:
+                break
+            count = min(count, length)
+            segments.append(self._run_many(state, start, step, reset, count, flip))
+            length -= count
+        return segments
+
+    def trajectory(
+        self, length: int, seed: int | Random | None = None
+    ) -> list[tuple[tuple[int, int, int] | None, tuple[int, int, int] | None]]:
+        """
+        Evaluates the program for `length` slices into a flat trajectory of
+        (fg, bg) colors per slice (`None` where the slice is not colored).
+        """
+        trajectory = []
+        for fg, bg, count in self.columns(length, seed):
+            trajectory.extend(
+                zip(zip(*fg) if fg else [None] * count, zip(*bg) if bg else [None] * count)
+            )
+        return trajectory
+
+    def apply(
         self,
-        instructions: list[MulticolorInstruction] | None = None,
-        reset: str | None = None,
-        repeat: int | str | None = None,
-    ) -> None:
-        self.instructions = instructions if instructions else []
-        self.reset = reset
-        if isinstance(repeat, str):
-            self.repeat = int(repeat[7:-1])
-        else:
-            self.repeat = 1 if repeat is None else repeat
+        string: "ANSIString",
+        *slices: Annotated[Sequence[int], Length(3)] | slice,
+        seed: int | Random | None = None,
+    ) -> "ANSIString":
+        """Applies the program to the string (see `ANSIString.multicolor`)."""
+        return string.multicolor(self, *slices, seed=seed)
+
+    def __repr__(self) -> str:
+        return f"MulticolorProgram.compile({self.sequence!r})"
+
+
+@lru_cache(maxsize=256)
+def _compile_multicolor_program(sequence: str) -> MulticolorProgram:
+    return MulticolorProgram(sequence)
+
+
+@lru_cache(maxsize=256)
+def _compile_regex(pattern: str, flags: int) -> re.Pattern[str]:
+    return re.compile(pattern, flags)
+
+
+def _compile_pattern(pattern: str | re.Pattern[str], flags: int = 0) -> re.Pattern[str]:
+    if isinstance(pattern, re.Pattern):
+        if flags:
+            raise ValueError("cannot process flags argument with a compiled pattern")
+        return pattern
+    return _compile_regex(pattern, flags)
+
+
+@lru_cache(maxsize=4096)
+def _encode_escape(style: str, encoding: str) -> bytes:
+    return style.encode(encoding)
+
+
+# number of chars of `plain` encoded at a time by `render_bytes` and `render_into`
+_ENCODE_CHUNK_SIZE = 8192
+
+
+# `str` attributes whose results are wrapped into `ANSIString` by `__getattribute__`
+_WRAPPED_STR_ATTRIBUTES = frozenset(dir(str)) - {
+    "ljust", "rjust", "center", "split",
+    "rsplit", "join", "splitlines", "format", "format_map",
+    "__class__", "__reduce__", "__reduce_ex__",  # pickling
+}
+
+
+# the format spec of strings: [[fill]align][width][.precision][s]
+_STRING_FORMAT_SPEC = re.compile(r"(?:(.)?([<>^]))?(0)?(\d+)?(?:\.(\d+))?s?", re.DOTALL)
+
+# Locks of the renders of `ANSIString.styled`, by `id` of the string
+_RENDER_LOCKS = tuple(Lock() for _ in range(64))
+
+
+def _render_lock(string: "ANSIString") -> Lock:
+    """Returns the render lock of the string."""
+    # ids are aligned and allocated close together: mix their bits (Fibonacci
+    # hashing) so that strings spread over all the stripes
+    return _RENDER_LOCKS[(id(string) * 0x9E3779B97F4A7C15 >> 32) % len(_RENDER_LOCKS)]
+
+
+class RenderCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    currsize: int
+    maxsize: int
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class RenderCache:
+    """
+    A process-wide, size-bounded cache of renders shared by equal strings:
+    keyed by a fingerprint of `plain` and the styles (regardless of their
+    order) and by the `_render` of the string's class (so subclasses
+    rendering differently do not share renders), with least-recently-used
+    eviction beyond `maxsize` entries.
+
+    Strings longer than `max_length` characters are rendered without it.
+    Fingerprints are computed from the styles at render time, so strings
+    modified after a render (with `fm`, `unfm`, ...) look up their new styles.
+
+    Usage:
+        >>> cache = enable_render_cache(maxsize=4096)
+        >>> ...
+        >>> cache.info().hit_ratio
+    """
+
+    def __init__(self, maxsize: int = 1024, max_length: int = 4096) -> None:
+        if maxsize < 1:
+            raise ValueError(f"maxsize must be positive ({maxsize=})")
+        self.maxsize = maxsize
+        self.max_length = max_length
+        self._renders: OrderedDict[tuple[Callable, str, tuple[int, ...], tuple[str, ...]], str] = OrderedDict()
+        self._lock = Lock()
+        self._hits = self._misses = self._evictions = 0
+
+    def render(self, string: "ANSIString") -> str:
+        """Returns the render of the string, from the cache if an equal one has been rendered."""
+        if len(string) > self.max_length:
+            return string._render()
+        # fingerprint: the sorted indices and their styles (faster to build
+        # and hash than a tuple of items)
+        styles = string.styles
+        indices = sorted(styles)
+        values = tuple(map(styles.__getitem__, indices))
+        # with the render function, for subclasses overriding `_render`
+        key = (type(string)._render, string.plain, tuple(indices), values)
+        renders = self._renders
+        with self._lock:
+            rendered = renders.get(key)
+            if rendered is not None:
+                renders.move_to_end(key)
+                self._hits += 1
+                return rendered
+            self._misses += 1
+        rendered = string._render(dict(zip(indices, values)))  # the snapshot of the key
+        with self._lock:
+            renders[key] = rendered
+            if len(renders) > self.maxsize:
+                renders.popitem(last=False)
+                self._evictions += 1
+        return rendered
+
+    def info(self) -> RenderCacheInfo:
+        with self._lock:
+            return RenderCacheInfo(self._hits, self._misses, self._evictions, len(self._renders), self.maxsize)
+
+    def clear(self) -> None:
+        """Empties the cache and resets its statistics."""
+        with self._lock:
+            self._renders.clear()
+            self._hits = self._misses = self._evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._renders)
+
+    def __repr__(self) -> str:
+        return f"RenderCache(maxsize={self.maxsize}, max_length={self.max_length})"
+
+
+# The render cache used by `ANSIString.styled`, opt-in (see `enable_render_cache`)
+_render_cache: RenderCache | None = None
+
+
+def enable_render_cache(maxsize: int = 1024, max_length: int = 4096) -> RenderCache:
+    """Makes `ANSIString.styled` render through a new process-wide `RenderCache` and returns it."""
+    global _render_cache
+    _render_cache = RenderCache(maxsize, max_length)
+    return _render_cache
+
+
+def disable_render_cache() -> None:
+    global _render_cache
+    _render_cache = None
+
+
+# `HUE_STYLES` by mode, as used by `ANSIString.rainbow`
+_HUE_TABLES = {
+    mode: tuple(getattr(hue_styles, mode) for hue_styles in HUE_STYLES)
+    for mode in HueStyles._fields
+}
+
+# methods of `ANSIString` modifying the styles in place
+_STYLING_METHODS = (
+    "fm", "fm_w", "fm_re", "fm_re_groups", "unfm", "unfm_w", "unfm_re",
+    *(
+        f"{ground}_{depth}{suffix}"
+        for ground in ("fg", "bg")
+        for depth in ("4b", "8b", "24b")
+        for suffix in ("", "_w", "_re")
+    ),
+    "rainbow", "multicolor", "multicolor_c",
+)
+
+
+# (method name, positional arguments, keyword arguments)
+Operation = tuple[str, tuple, dict[str, Any]]
+
+# below this number of lines `ANSIString.render_many` does not start workers
+PARALLEL_THRESHOLD = 4096
+
+
+def _normalize_operations(
+    operations: Iterable[str | tuple[str] | tuple[str, Sequence] | tuple[str, Sequence, dict]],
+) -> tuple[Operation, ...]:
+    normalized = []
+    for operation in operations:
+        if isinstance(operation, str):
+            operation = (operation,)
+        name, args, kwargs = (*operation, (), {})[:3]
+        if name not in _STYLING_METHODS:
+            raise ValueError(f"{name!r} is not a styling method of ANSIString")
+        normalized.append((name, tuple(args), dict(kwargs)))
+    return tuple(normalized)
+
+
+# below this length `ANSIString.render(parallel=True)` renders serially
+PARALLEL_RENDER_THRESHOLD = 1 << 20
+
+# (plain, styles) of the string rendered by the process workers of `ANSIString.render`
+_render_source: tuple[str, dict[int, str]] | None = None
+
+
+def _set_render_source(plain: str, styles: dict[int, str]) -> None:
+    global _render_source
+    _render_source = (plain, styles)
+
+
+def _render_range(start: int, stop: int, source: tuple[str, dict[int, str]] | None = None) -> str:
+    """Renders `plain[start:stop]` of the source (`_render_source` if `None`)."""
+    plain, styles = source or _render_source
+    return "".join(
+        f"{styles[index]}{char}\x1b[0m" if index in styles else char
+        for index, char in enumerate(plain[start:stop], start)
+    )
+
+
+def _gil_enabled() -> bool:
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is None or is_gil_enabled()
+
+
+def _render_chunk(lines: list[str], operations: tuple[Operation, ...]) -> list[str]:
+    rendered = []
+    for line in lines:
+        string = ANSIString(line)
+        for name, args, kwargs in operations:
+            getattr(string, name)(*args, **kwargs)
+        rendered.append(string.styled)
+    return rendered
 
 
 class ANSIString(str):
@@ -159,17 +741,25 @@ class ANSIString(str):
 
     Instance Attributes:
         _styles: dictionary containing pairs of char indices with ANSI escape sequences.
-        _styled: plain string to which ANSI e.s. from `_styles` has been applied.
+        _styled: `(version, rendered)`, the plain string to which ANSI e.s. from
+        `_styles` has been applied and the version of `_styles` it was rendered
+        from (rendered lazily, on the first access to `styled`).
+        _display_width: cached `display_width`.
 
     Properties:
         styles: a getter for `_styles`.
-        styled: a getter for `_styled` (checks if `styles` has been modified and renders it if so).
+        styled: a getter for `_styled` (renders it again if the version of `styles` has changed).
         plain: unformatted, normal string.
         actual_length: returns the length of `styled`.
+        display_width: number of terminal columns of `plain` (wide chars count
+        for two, combining and control chars for none).
 
     Note:
         *The `ANSIString` class is unhashable for consistency, because `styles` is an unhashable dict
-        that we can change.
+        that we can change; `freeze()` returns a hashable `FrozenANSIString`.
+        *Reading `styled` is thread-safe: the render is cached with the version of `styles` as
+        one tuple, read without locking; on a miss, concurrent readers of the same string wait
+        for a single render (under one of `_RENDER_LOCKS`).
     """
 
     def __new__(cls, string: str = "", styles: StyleDict | dict[int, str] | None = None) -> Self:
@@ -180,7 +770,8 @@ class ANSIString(str):
             obj._styles = StyleDict(styles)
         else:
             obj._styles = styles
-        obj._styled = cls._render(obj)
+        obj._styled = None
+        obj._display_width = None
         return obj
 
     @property
@@ -189,9 +780,17 @@ class ANSIString(str):
 
     @property
     def styled(self) -> str:
-        if self._styles.has_been_modified:
-            self._styled = self._render()
-        return self._styled
+        cached, version = self._styled, self._styles._version
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        with _render_lock(self):
+            cached, version = self._styled, self._styles._version
+            if cached is None or cached[0] != version:
+                # the version is read before rendering: a concurrent modification
+                # stamps a newer one, so the next read renders again
+                rendered = self._render() if _render_cache is None else _render_cache.render(self)
+                cached = self._styled = (version, rendered)
+        return cached[1]
 
     @property
     def plain(self) -> str:
@@ -201,6 +800,12 @@ class ANSIString(str):
     def actual_length(self) -> int:
         return len(self.styled)
 
+    @property
+    def display_width(self) -> int:
+        if self._display_width is None:
+            self._display_width = display_width(self.plain)
+        return self._display_width
+
     def __str__(self) -> str:
         return self.styled
 
@@ -212,14 +817,14 @@ class ANSIString(str):
 
     def __add__(self, string) -> "ANSIString":
         styles = self.styles.copy()
-        if type(string) == ANSIString:
+        if isinstance(string, ANSIString):
             styles.update({len(self) + index: value for index, value in string.styles.items()})
             string = string.plain
         return type(self)(self.plain + string, styles)
 
     def __radd__(self, string) -> "ANSIString":
         styles = {index + len(string): value for index, value in self.styles.items()}
-        if type(string) == ANSIString:
+        if isinstance(string, ANSIString):
             styles.update(string.styles)
             string = string.plain
         return type(self)(string + self.plain, styles)
@@ -233,11 +838,7 @@ class ANSIString(str):
         return type(self)(super().__getitem__(key), styles)
 
     def __getattribute__(self, name: str):
-        allowed_names = {
-            "ljust", "rjust", "center", "split",
-            "rsplit", "join", "splitlines",
-        }
-        if name in dir(str) and name not in allowed_names:
+        if name in _WRAPPED_STR_ATTRIBUTES:
 
             def method(self, *args, **kwargs):
                 value = getattr(super(), name)(*args, **kwargs)
@@ -254,49 +855,305 @@ class ANSIString(str):
         else:
             return super().__getattribute__(name)
 
+    def __reduce__(self) -> tuple:
+        # the cached render is not pickled: it is keyed on a version of this process
+        return type(self), (self.plain, self.styles)
+
+    def freeze(self) -> "FrozenANSIString":
+        """Returns an immutable, hashable copy of the string."""
+        return FrozenANSIString(self.plain, self.styles)
+
+    def thaw(self) -> "ANSIString":
+        """Returns a mutable copy of the string."""
+        return ANSIString(self.plain, StyleDict(self.styles))
+
     def __format__(self, format_spec: str):
-        if len(format_spec) > 1 and (align := format_spec[1]) in ("<", ">", "^"):
-            fill = format_spec[0]
-            minimum_width = int(format_spec[2:])
-            if align == "<":
-                return self.ljust(minimum_width, fill)
-            elif align == ">":
-                return self.rjust(minimum_width, fill)
-            elif align == "^":
-                return self.center(minimum_width, fill)
-        return super().__format__(format_spec)
-
-    def _render(self) -> str:
+        # [[fill]align][0][width][.precision][s], aligned and truncated by display width
+        match = _STRING_FORMAT_SPEC.fullmatch(format_spec)
+        if not format_spec or match is None:
+            return super().__format__(format_spec)
+        fill, align, zero, width, precision = match.groups()
+        string = self if precision is None else self.truncate(int(precision), "")
+        if width is None:
+            return string
+        fill, width = fill or ("0" if zero else " "), int(width)
+        if align == ">":
+            return string.rjust(width, fill)
+        elif align == "^":
+            return string.center(width, fill)
+        return string.ljust(width, fill)
+
+    def _render(self, styles: dict[int, str] | None = None) -> str:
+        if styles is None:
+            styles = self.styles
         return "".join(
-            f"{self.styles[index]}{char}\x1b[0m" if index in self.styles else char
+            f"{styles[index]}{char}\x1b[0m" if index in styles else char
             for index, char in enumerate(self.plain)
         )
 
+    def _downgraded_styles(self, color_depth: Literal[24, 8, 4, 0]) -> dict[int, str]:
+        """Returns `styles` with the colors converted to the color depth (see `downgrade_style`)."""
+        styles = self.styles
+        if color_depth not in (24, 8, 4, 0):
+            raise ValueError(f"unsupported color depth ({color_depth=}, expected 24, 8, 4 or 0)")
+        elif color_depth == 24:
+            return styles
+        downgraded = {style: downgrade_style(style, color_depth) for style in set(styles.values())}
+        return {
+            index: downgraded[style] for index, style in styles.items() if downgraded[style]
+        }
+
+    def render(
+        self,
+        color_depth: Literal[24, 8, 4, 0] = 24,
+        parallel: bool = False,
+        workers: int | None = None,
+        executor: Literal["process", "thread"] | Executor | None = None,
+    ) -> str:
+        """
+        Returns the rendered string with its colors converted to the color
+        depth: 24-bit (`styled`), 8-bit (256 colors), 4-bit (16 colors) or
+        0 (no colors, other styles are kept). Each distinct style is converted
+        once, through cached lookup tables.
+
+        With `parallel`, strings of `PARALLEL_RENDER_THRESHOLD` characters or
+        more are split at style-run boundaries into chunks rendered by
+        `workers` processes (threads on free-threaded builds, or the given
+        `Executor`) and concatenated. Process workers get the string once,
+        when they start (for free with the "fork" start method).
+        """
+        if isinstance(executor, str) and executor not in ("process", "thread"):
+            raise ValueError(f"unknown executor {executor!r} (expected 'process' or 'thread')")
+        if workers is None:
+            workers = os.cpu_count() or 1
+        version = self._styles._version
+        if (
+            not parallel
+            or len(self) < PARALLEL_RENDER_THRESHOLD
+            or workers <= 1 and not isinstance(executor, Executor)
+        ):
+            if color_depth == 24:
+                return self.styled
+            return self._render(self._downgraded_styles(color_depth))
+
+        plain, styles = self.plain, dict(self._downgraded_styles(color_depth))
+        bounds = self._run_bounds(styles, workers * 4)
+        starts, stops = bounds[:-1], bounds[1:]
+        if isinstance(executor, Executor):  # each chunk is sent with its task
+            spans = list(zip(starts, stops))
+            sources = [
+                (plain[start:stop], chunk_styles)
+                for (start, stop), chunk_styles in zip(spans, self._slice_styles(spans, styles))
+            ]
+            lengths = [stop - start for start, stop in spans]
+            rendered = "".join(executor.map(_render_range, [0] * len(spans), lengths, sources))
+        elif executor == "thread" or executor is None and not _gil_enabled():
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                rendered = "".join(pool.map(partial(_render_range, source=(plain, styles)), starts, stops))
+        else:
+            with ProcessPoolExecutor(workers, initializer=_set_render_source, initargs=(plain, styles)) as pool:
+                rendered = "".join(pool.map(_render_range, starts, stops))
+        if color_depth == 24:
+            self._styled = (version, rendered)
+        return rendered
+
+    def _run_bounds(self, styles: dict[int, str], chunks: int) -> list[int]:
+        """
+        Returns the bounds of about `chunks` equal chunks of the string, each
+        moved forward to the next style-run boundary (within 4096 chars).
+        """
+        length, bounds = len(self), [0]
+        for chunk in range(1, chunks):
+            bound = max(length * chunk // chunks, bounds[-1] + 1)
+            limit = min(length, bound + 4096)
+            while bound < limit and styles.get(bound - 1) == styles.get(bound) is not None:
+                bound += 1
+            if bound >= length:
+                break
+            bounds.append(bound)
+        bounds.append(length)
+        return bounds
+
+    def iter_render(
+        self, chunk_size: int = 65536, color_depth: Literal[24, 8, 4, 0] = 24
+    ) -> Generator[str]:
+        """
+        Lazily yields the rendered string (see `render`) in chunks, each one
+        rendering at most `chunk_size` characters of `plain`, so that it
+        is never materialized as a whole.
+        """
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be positive ({chunk_size=})")
+        styles, plain = self._downgraded_styles(color_depth), self.plain
+        keys = styles.keys()
+        for start in range(0, len(plain), chunk_size):
+            stop = min(start + chunk_size, len(plain))
+            if not styles or keys.isdisjoint(range(start, stop)):
+                yield plain[start:stop]
+                continue
+            yield "".join(
+                f"{styles[index]}{char}\x1b[0m" if index in styles else char
+                for index, char in enumerate(plain[start:stop], start)
+            )
+
+    def write_to(
+        self,
+        fp: IO,
+        chunk_size: int = 65536,
+        encoding: str = "utf-8",
+        color_depth: Literal[24, 8, 4, 0] = 24,
+    ) -> int:
+        """
+        Writes the rendered string to the file object chunk by chunk (see
+        `iter_render`), encoding it for binary files, and returns the number
+        of characters (or bytes) written.
+        """
+        mode = getattr(fp, "mode", "")
+        binary = isinstance(fp, (io.RawIOBase, io.BufferedIOBase)) or isinstance(mode, str) and "b" in mode
+        written = 0
+        for chunk in self.iter_render(chunk_size, color_depth):
+            if binary:
+                chunk = chunk.encode(encoding)
+            fp.write(chunk)
+            written += len(chunk)
+        return written
+
+    def _iter_encoded(
+        self, encoding: str, color_depth: Literal[24, 8, 4, 0]
+    ) -> Generator[list[bytes]]:
+        """
+        Lazily yields the rendered string as lists of encoded parts (plain
+        segments and styled runs), `_ENCODE_CHUNK_SIZE` chars of `plain` at a time.
+        """
+        styles, plain = self._downgraded_styles(color_depth), self.plain
+        if not styles:
+            for offset in range(0, len(plain), _ENCODE_CHUNK_SIZE):
+                yield [plain[offset:offset + _ENCODE_CHUNK_SIZE].encode(encoding)]
+            return
+        reset = _encode_escape("\x1b[0m", encoding)
+        encode = partial(str.encode, encoding=encoding)
+        cells: dict[tuple[str | None, str], bytes] = {}
+        for offset in range(0, len(plain), _ENCODE_CHUNK_SIZE):
+            chunk = plain[offset:offset + _ENCODE_CHUNK_SIZE]
+            keys = list(map(styles.get, range(offset, offset + len(chunk))))
+            parts = []
+            if sum(map(ne, keys, islice(keys, 1, None))) * 8 > len(keys):
+                # many short runs: one cached part per (style, char)
+                for key in zip(keys, chunk):
+                    part = cells.get(key)
+                    if part is None:
+                        style, char = key
+                        part = char.encode(encoding)
+                        if style:
+                            part = _encode_escape(style, encoding) + part + reset
+                        cells[key] = part
+                    parts.append(part)
+                yield parts
+                continue
+
+            position = 0
+            # runs of consecutive chars sharing a style (or none)
+            for style, run in groupby(keys):
+                stop = position + len(list(run))
+                if style is None:
+                    parts.append(chunk[position:stop].encode(encoding))
+                else:
+                    prefix = _encode_escape(style, encoding)
+                    # style + char + reset for every char of the run
+                    parts.append(prefix + (reset + prefix).join(map(encode, chunk[position:stop])) + reset)
+                position = stop
+            yield parts
+
+    def render_bytes(
+        self, encoding: str = "utf-8", color_depth: Literal[24, 8, 4, 0] = 24
+    ) -> bytes:
+        """
+        Returns the encoded rendered string (see `render`), built from encoded
+        plain segments and pre-encoded escape sequences instead of encoding
+        a rendered `str`. The encoding must not add a BOM to every part
+        (e.g. "utf-16-le" rather than "utf-16").
+        """
+        return b"".join(chain.from_iterable(self._iter_encoded(encoding, color_depth)))
+
+    def render_into(
+        self,
+        buffer: bytearray | memoryview,
+        offset: int = 0,
+        encoding: str = "utf-8",
+        color_depth: Literal[24, 8, 4, 0] = 24,
+    ) -> int:
+        """
+        Writes the encoded rendered string (see `render_bytes`) into the
+        buffer from `offset`, chunk by chunk as it is encoded, and returns the
+        number of bytes written. A `bytearray` grows if needed; a `memoryview`
+        too small raises `ValueError` telling the number of bytes needed (once
+        the parts that fit are written).
+        """
+        if isinstance(buffer, bytearray):
+            if len(buffer) < offset:
+                buffer.extend(bytes(offset - len(buffer)))
+            size = None  # grows with slice assignments past its end
+        else:
+            size = len(buffer)
+        position = offset
+        encoded = self._iter_encoded(encoding, color_depth)
+        for parts in encoded:
+            for index, part in enumerate(parts):
+                stop = position + len(part)
+                if size is not None and stop > size:
+                    needed = position - offset + sum(map(len, chain(islice(parts, index, None), *encoded)))
+                    raise ValueError(
+                        f"buffer too small ({needed} bytes needed, {size - offset} available from {offset=})"
+                    )
+                buffer[position:stop] = part
+                position = stop
+        return position - offset
+
+    def _get_line_index(self) -> tuple[tuple[int, ...], tuple[int, ...]]:
+        """Returns the start indices and lengths of the lines of `plain` (cached)."""
+        try:
+            return self._line_index
+        except AttributeError:
+            starts, index = [], 0
+            for line in self.plain.splitlines(keepends=True):
+                starts.append(index)
+                index += len(line)
+            lengths = tuple(map(len, self.plain.splitlines()))
+            self._line_index = (tuple(starts), lengths)
+            return self._line_index
+
     def _coord_to_slice(self, coord: tuple[int, int]) -> slice:
-        index = 0
-        lengths = tuple(len(line) for line in self.plain.splitlines())
+        starts, lengths = self._get_line_index()
         if not lengths:
             raise IndexError(f"wrong y coordinate (empty string)")
         elif not (0 <= coord[1] < len(lengths)):
             raise IndexError(f"wrong y coordinate (0<=y<{len(lengths)})")
-        for y, length in enumerate(lengths):
-            if y == coord[1]:
-                if not length:
-                    raise IndexError(f"wrong x coordinate ({y=}: empty line)")
-                elif not (0 <= coord[0] < length):
-                    raise IndexError(f"wrong x coordinate ({y=}: 0<=x<{length})")
-                index += coord[0] + y
-                break
-            index += length
+        y, length = coord[1], lengths[coord[1]]
+        if not length:
+            raise IndexError(f"wrong x coordinate ({y=}: empty line)")
+        elif not (0 <= coord[0] < length):
+            raise IndexError(f"wrong x coordinate ({y=}: 0<=x<{length})")
+        index = starts[y] + coord[0]
         return slice(index, index + 1)
 
-    def _get_all_coords(self) -> tuple[tuple[int, int]]:
-        def transform(lengths):
-            for y, length in enumerate(lengths):
-                for x in range(length):
-                    yield (x, y)
+    def coords_to_slices(
+        self, *coordinates: tuple[int, int] | tuple[tuple[int, int], ...]
+    ) -> tuple[slice | tuple[slice, ...], ...]:
+        """
+        Converts (x, y) coordinates (or tuples of them) into slices of the
+        string, where y is the line number (as in `splitlines`).
+        """
+        coord_to_slice = self._coord_to_slice
+        return tuple(
+            tuple(map(coord_to_slice, obj)) if isinstance(obj[0], tuple) else coord_to_slice(obj)
+            for obj in coordinates
+        )
 
-        return tuple(transform(len(line) for line in self.plain.splitlines()))
+    def iter_coords(self) -> Generator[tuple[int, int]]:
+        """Lazily yields the (x, y) coordinates of all characters but line breaks."""
+        for y, length in enumerate(self._get_line_index()[1]):
+            for x in range(length):
+                yield (x, y)
 
     def _get_indices(
         self, slice_: Annotated[Sequence[int], Length(3)] | slice
@@ -310,60 +1167,36 @@ class ANSIString(str):
     def _search_spans(
         self, *words: str, case_sensitive: bool = True
     ) -> tuple[tuple[int, int], ...]:
-        flags = 0 if case_sensitive else re.IGNORECASE
-        words = "|".join(re.escape(word) for word in words)
-        spans = (match.span(0) for match in re.finditer(words, self.plain, flags=flags))
-        return tuple(spans)
-
-    def _process_multicolor_command(
-        self,
-        command: MulticolorCommand,
-        rgb: dict[str, dict[str, dict[str, int]]],
-        *slices: Annotated[Sequence[int], Length(3)] | slice,
-    ):
-        if command.reset:
-            if command.reset == "?":
-                reset_rgb = deepcopy(rgb["actual"])
-            elif command.reset == "??":
-                reset_rgb = deepcopy(rgb["start"])
-        else:
-            reset_rgb = None
-
-        modes = {"fg": False, "bg": False, "ul": False}
-        for instruction in command.instructions:
-            if not modes[instruction.mode]:
-                modes[instruction.mode] = True
-            if instruction.operator == "=":
-                rgb["actual"][instruction.mode][instruction.color] = instruction.processed_value
-            elif instruction.operator == "+":
-                rgb["actual"][instruction.mode][instruction.color] += instruction.processed_value
-            elif instruction.operator == "-":
-                rgb["actual"][instruction.mode][instruction.color] -= instruction.processed_value
-
-            rgb["actual"][instruction.mode][instruction.color] = clamp(
-                rgb["actual"][instruction.mode][instruction.color], *instruction.minmax
-            )
-
-        if slices:
-            self._apply_multicolor_command(rgb["actual"], modes, *slices)
-
-        if reset_rgb:
-            rgb["actual"] = reset_rgb
-
-        return modes
+        return tuple(WordMatcher.compile(words, case_sensitive).spans(self.plain))
+
+    def _search_re_spans(
+        self, pattern: str | re.Pattern[str], flags: int = 0, group: int | str = 0
+    ) -> list[tuple[int, int]]:
+        return [
+            span for match in _compile_pattern(pattern, flags).finditer(self.plain)
+            if (span := match.span(group))[0] != span[1]
+        ]
+
+    def _fm_spans(self, style: str, spans: Iterable[tuple[int, int]]) -> Self:
+        """Appends the style to the indices of the spans in one update of `styles`."""
+        additions: dict[int, str] = {}
+        for start, stop in spans:
+            additions.update(dict.fromkeys(range(start, stop), style))
+        self._extend_styles(additions)
+        return self
 
-    def _apply_multicolor_command(
-        self,
-        rgb: dict[str, dict[str, int]],
-        modes: dict[str, bool],
-        *slices: Annotated[Sequence[int], Length(3)] | slice,
-    ) -> None:
-        if modes["fg"]:
-            self.fg_24b(*(int(clamp(rgb["fg"][key], 0, 255)) for key in "rgb"), *slices)
-        if modes["bg"]:
-            self.bg_24b(*(int(clamp(rgb["bg"][key], 0, 255)) for key in "rgb"), *slices)
-        if modes["ul"]:
-            NotImplemented
+    def _extend_styles(self, additions: dict[int, str]) -> None:
+        """Appends the styles to their indices in one update of `styles`."""
+        if not additions:
+            return
+        styles = self.styles
+        if styles:
+            additions = {
+                index: styles[index] + style if index in styles else style
+                for index, style in additions.items()
+            }
+        dict.update(styles, additions)
+        styles._bump()
 
     @staticmethod
     def from_ansi(plain: str) -> "ANSIString":
@@ -425,6 +1258,43 @@ class ANSIString(str):
             parameter, *self._search_spans(*words, case_sensitive=case_sensitive)
         )
 
+    def fm_re(
+        self,
+        parameter: int | str,
+        pattern: str | re.Pattern[str],
+        flags: int = 0,
+        group: int | str = 0,
+    ) -> Self:
+        """Formats (applies styling to) the matches (or their `group`) of the regex."""
+        if parameter == SGR.RESET:
+            return self.unfm_re(pattern, flags, group)
+        return self._fm_spans(f"\x1b[{parameter}m", self._search_re_spans(pattern, flags, group))
+
+    def fm_re_groups(
+        self,
+        pattern: str | re.Pattern[str],
+        parameters: Mapping[int | str, int | str],
+        flags: int = 0,
+    ) -> Self:
+        r"""
+        Formats the groups of the regex matches, each with its own parameter
+        (group number or name -> SGR parameter), in one update of `styles`.
+
+        Usage:
+            >>> string.fm_re_groups(
+            ...     r"(?P<time>\d\d:\d\d:\d\d) (?P<level>ERROR|WARN)",
+            ...     {"time": SGR.DIM, "level": f"{Foreground.SET};2;255;0;0"},
+            ... )
+        """
+        styles = [(group, f"\x1b[{parameter}m") for group, parameter in parameters.items()]
+        additions: dict[int, str] = {}
+        for match in _compile_pattern(pattern, flags).finditer(self.plain):
+            for group, style in styles:
+                for index in range(*match.span(group)):
+                    additions[index] = additions.get(index, "") + style
+        self._extend_styles(additions)
+        return self
+
     def unfm(self, *slices: Annotated[Sequence[int], Length(3)] | slice) -> Self:
         """Unformats (removes styling) the string in a specified range."""
         if slices:
@@ -442,6 +1312,19 @@ class ANSIString(str):
         """Unformats (removes styling) the string per word index."""
         return self.unfm(*self._search_spans(*words, case_sensitive=case_sensitive))
 
+    def unfm_re(
+        self, pattern: str | re.Pattern[str], flags: int = 0, group: int | str = 0
+    ) -> Self:
+        """Unformats (removes styling) the matches (or their `group`) of the regex."""
+        styles, removed = self.styles, False
+        for start, stop in self._search_re_spans(pattern, flags, group):
+            for index in range(start, stop):
+                if dict.pop(styles, index, None) is not None:
+                    removed = True
+        if removed:
+            styles._bump()
+        return self
+
     def fg_4b(
         self,
         parameter: Foreground,
@@ -459,6 +1342,15 @@ class ANSIString(str):
             parameter, *self._search_spans(*words, case_sensitive=case_sensitive)
         )
 
+    def fg_4b_re(
+        self,
+        parameter: Foreground,
+        pattern: str | re.Pattern[str],
+        flags: int = 0,
+        group: int | str = 0,
+    ) -> Self:
+        return self.fm_re(parameter, pattern, flags, group)
+
     def fg_8b(
         self,
         parameter: Annotated[int, ValueRange(0, 255)],
@@ -478,6 +1370,15 @@ class ANSIString(str):
             parameter, *self._search_spans(*words, case_sensitive=case_sensitive)
         )
 
+    def fg_8b_re(
+        self,
+        parameter: Annotated[int, ValueRange(0, 255)],
+        pattern: str | re.Pattern[str],
+        flags: int = 0,
+        group: int | str = 0,
+    ) -> Self:
+        return self.fm_re(f"{Foreground.SET};5;{parameter}", pattern, flags, group)
+
     def fg_24b(
         self,
         r: Annotated[int, ValueRange(0, 255)],
@@ -501,6 +1402,17 @@ class ANSIString(str):
             r, g, b, *self._search_spans(*words, case_sensitive=case_sensitive)
         )
 
+    def fg_24b_re(
+        self,
+        r: Annotated[int, ValueRange(0, 255)],
+        g: Annotated[int, ValueRange(0, 255)],
+        b: Annotated[int, ValueRange(0, 255)],
+        pattern: str | re.Pattern[str],
+        flags: int = 0,
+        group: int | str = 0,
+    ) -> Self:
+        return self.fm_re(f"{Foreground.SET};2;{r};{g};{b}", pattern, flags, group)
+
     def bg_4b(
         self,
         parameter: Foreground,
@@ -518,6 +1430,15 @@ class ANSIString(str):
             parameter, *self._search_spans(*words, case_sensitive=case_sensitive)
         )
 
+    def bg_4b_re(
+        self,
+        parameter: Background,
+        pattern: str | re.Pattern[str],
+        flags: int = 0,
+        group: int | str = 0,
+    ) -> Self:
+        return self.fm_re(parameter, pattern, flags, group)
+
     def bg_8b(
         self,
         parameter: Annotated[int, ValueRange(0, 255)],
@@ -537,6 +1458,15 @@ class ANSIString(str):
             parameter, *self._search_spans(*words, case_sensitive=case_sensitive)
         )
 
+    def bg_8b_re(
+        self,
+        parameter: Annotated[int, ValueRange(0, 255)],
+        pattern: str | re.Pattern[str],
+        flags: int = 0,
+        group: int | str = 0,
+    ) -> Self:
+        return self.fm_re(f"{Background.SET};5;{parameter}", pattern, flags, group)
+
     def bg_24b(
         self,
         r: Annotated[int, ValueRange(0, 255)],
@@ -560,6 +1490,17 @@ class ANSIString(str):
             r, g, b, *self._search_spans(*words, case_sensitive=case_sensitive)
         )
 
+    def bg_24b_re(
+        self,
+        r: Annotated[int, ValueRange(0, 255)],
+        g: Annotated[int, ValueRange(0, 255)],
+        b: Annotated[int, ValueRange(0, 255)],
+        pattern: str | re.Pattern[str],
+        flags: int = 0,
+        group: int | str = 0,
+    ) -> Self:
+        return self.fm_re(f"{Background.SET};2;{r};{g};{b}", pattern, flags, group)
+
     def rainbow(
         self, 
         *slices: Annotated[Sequence[int], Length(3)] | slice,
@@ -567,198 +1508,142 @@ class ANSIString(str):
         fg: bool = False,
         bg: bool = False,
         ul: bool = False,
+        offset: int = 0,
     ) -> Self:
-        if not slices:
-            slices = tuple(
-                (index, index+1) for index, char in enumerate(self.plain)
-                if not (skip_whitespace and char in WHITESPACE)
-            )
+        """
+        Applies rainbow coloring (hues from `HUE_STYLES`) to the string,
+        one hue per slice; `offset` shifts the hues, e.g. for animation.
+        """
         if not (fg or bg or ul):
             fg = True
-        length = len(slices)
-        for index, slice_ in enumerate(slices):
-            hue = round(index / length * 360)
-            if fg:
-                self.fg_24b(*hsl_to_rgb(hue), slice_)
-            elif bg:
-                self.bg_24b(*hsl_to_rgb(hue), slice_)
-            elif ul:
-                NotImplemented
+        mode = "fg" if fg else "bg" if bg else "ul"
+        if not slices:
+            indices = [
+                index for index, char in enumerate(self.plain)
+                if not (skip_whitespace and char in WHITESPACE)
+            ]
+        length = len(slices) if slices else len(indices)
+        table = _HUE_TABLES[mode]
+        styles = map(table.__getitem__, rainbow_hues(length, offset))
+
+        if not slices:
+            self._extend_styles(dict(zip(indices, styles)))
+            return self
+
+        get_indices = self._get_indices
+        additions: dict[int, str] = {}
+        for slice_, style in zip(slices, styles):
+            for index in range(*get_indices(slice_)):
+                additions[index] = additions.get(index, "") + style
+        self._extend_styles(additions)
         return self
 
     def multicolor(
-        self, sequence: str, *slices: Annotated[Sequence[int], Length(3)] | slice
+        self,
+        sequence: "str | MulticolorProgram",
+        *slices: Annotated[Sequence[int], Length(3)] | slice,
+        seed: int | Random | None = None,
     ) -> Self:
-        if not slices:
-            slices = tuple((index, index + 1) for index in range(0, len(self)))
-
-        flags = {flag: 0 for flag in ("skipfirst", "cycle", "reverse", "mirror")}
-        char_to_flag = {
-            "*": "skipfirst",
-            "&": "cycle",
-            "@": "reverse",
-            "!": "mirror",
-        }
-        offset = 0
-        for char in reversed(sequence):
-            if char in char_to_flag:
-                flags[char_to_flag[char]] = 1
-                offset -= 1
-            elif char == " ":
-                offset -= 1
-            else:
-                break
-        if offset:
-            sequence = sequence[:offset]
-
-        rgb = {
-            key: {
-                key: {key: 0 for key in ("r", "g", "b")} for key in ("fg", "bg", "ul")
-            }
-            for key in ("actual", "start")
-        }
-
-        if "$" in sequence:
-            start_command, sequence = map(str.strip, sequence.split("$"))
-            object_start_command = MulticolorCommand()
-            for start_instruction in map(str.strip, start_command.split("|")):
-                match_start_instruction = re.match(
-                    Regex.MULTICOLOR_INSTRUCTION, start_instruction
+        """
+        Applies the multicolor sequence (or a compiled `MulticolorProgram`)
+        to the string, one color step per slice. With `seed` (an int or a
+        `random.Random`), "random(x,y)" values are reproducible.
+        """
+        program = MulticolorProgram.compile(sequence)
+        styles: list[str] = []
+        for fg, bg, count in program.columns(len(slices) if slices else len(self), seed):
+            if fg and bg:
+                styles.extend(
+                    map(add, rgb_sgr_many(Foreground.SET, *fg), rgb_sgr_many(Background.SET, *bg))
                 )
-                object_start_instruction = MulticolorInstruction(
-                    rgb["actual"],
-                    **match_start_instruction.groupdict(),
-                    repeat=object_start_command.repeat,
-                )
-                if match_start_instruction:
-                    object_start_command.instructions.append(object_start_instruction)
-            start_modes = self._process_multicolor_command(object_start_command, rgb)
-            rgb["start"] = deepcopy(rgb["actual"])
-
-        slices_length = len(slices) - (1 if flags["skipfirst"] else 0)
-        auto_length = slices_length
-        auto_count = 0
-        span_decrement = 0
-        list_repeats = []
-        for match_repeat in re.finditer(r"repeat\((?P<value>\d+|auto)\)", sequence):
-            start, stop = match_repeat.span()
-            if match_repeat["value"] == "auto":
-                auto_count += 1
-                list_repeats.append("auto")
+            elif fg:
+                styles.extend(rgb_sgr_many(Foreground.SET, *fg))
+            elif bg:
+                styles.extend(rgb_sgr_many(Background.SET, *bg))
             else:
-                value = int(repeat["value"])
-                if value < auto_length:
-                    value = auto_length
-                auto_length -= value
-                list_repeats.append(value)
-            start -= span_decrement
-            stop -= span_decrement
-            sequence = f"{sequence[:start]}{'{}'}{sequence[stop:]}"
-            span_decrement += len(match_repeat.group()) - len(r"{}")
-        for index, repeat in enumerate(list_repeats):
-            if repeat == "auto":
-                value = -(auto_length // -auto_count)
-                auto_length -= value
-                auto_count -= 1
-                list_repeats[index] = value
-        sequence = sequence.format(*(f"repeat({value})" for value in list_repeats))
+                styles.extend([""] * count)
 
-        commands: list[MulticolorCommand] = []
-        for command in map(str.strip, sequence.split("#")):
-            match_command = re.search(Regex.MULTICOLOR_COMMAND, command)
-            object_command = MulticolorCommand(None, **match_command.groupdict())
-            if object_command.repeat == 0:
+        if not slices:
+            additions = dict(enumerate(styles))
+            if "" in styles:
+                additions = {index: style for index, style in additions.items() if style}
+            self._extend_styles(additions)
+            return self
+
+        get_indices = self._get_indices
+        additions: dict[int, str] = {}
+        for obj, style in zip(slices, styles):
+            if not style:
                 continue
-            for instruction in map(str.strip, command.split("|")):
-                match_instruction = re.match(Regex.MULTICOLOR_INSTRUCTION, instruction)
-                if match_instruction:
-                    object_instruction = MulticolorInstruction(
-                        rgb["actual"],
-                        **match_instruction.groupdict(),
-                        repeat=object_command.repeat,
-                    )
-                    object_command.instructions.append(object_instruction)
-            for no in range(object_command.repeat):
-                commands.append(deepcopy(object_command))
-                self._process_multicolor_command(object_command, rgb)
-
-        rgb["actual"] = deepcopy(rgb["start"])
-
-        if flags["mirror"] and len(commands) > 1:
-            mirrored_commands: list[MulticolorCommand] = []
-            for command in reversed(commands):
-                mirrored_commands.append(
-                    MulticolorCommand(None, command.reset, command.repeat)
-                )
-                for instruction in command.instructions:
-                    copied_instruction = copy(instruction)
-                    if copied_instruction.operator == "+":
-                        copied_instruction.operator = "-"
-                    elif copied_instruction.operator == "-":
-                        copied_instruction.operator = "+"
-                    mirrored_commands[-1].instructions.append(copied_instruction)
-            commands.extend(mirrored_commands)
-        elif flags["reverse"]:
-            if flags["cycle"] and len(commands) < slices_length:
-                for command in cycle(commands):
-                    if len(commands) == slices_length:
-                        break
-                    copied_command = deepcopy(command)
-                    for instruction in copied_command.instructions:
-                        instruction.process_value(instruction.value, save=True)
-                    commands.append(copied_command)
-            for command in commands:
-                self._process_multicolor_command(command, rgb)
-                for instruction in command.instructions:
-                    if instruction.operator == "+":
-                        instruction.operator = "-"
-                    elif instruction.operator == "-":
-                        instruction.operator = "+"
-            commands.reverse()
-        if flags["cycle"] and not flags["reverse"]:
-            if len(commands) < slices_length:
-                for command in cycle(commands):
-                    if len(commands) == slices_length:
-                        break
-                    copied_command = deepcopy(command)
-                    for instruction in copied_command.instructions:
-                        instruction.process_value(instruction.value, save=True)
-                    commands.append(copied_command)
-
-        if flags["skipfirst"]:
-            if (
-                slices[0]
-                and isinstance(slices[0], Sequence)
-                and isinstance(slices[0][0], (Sequence, slice))
-            ):
-                self._apply_multicolor_command(rgb["actual"], start_modes, *slices[0])
-            else:
-                self._apply_multicolor_command(rgb["actual"], start_modes, slices[0])
-            slices = slices[1:]
-
-        for obj, command in zip(slices, commands):
-            if (
-                obj
-                and isinstance(obj, Sequence)
-                and isinstance(obj[0], (Sequence, slice))
-            ):
-                self._process_multicolor_command(command, rgb, *obj)
+            if obj and isinstance(obj, Sequence) and isinstance(obj[0], (Sequence, slice)):
+                group = obj
             else:
-                self._process_multicolor_command(command, rgb, obj)
-
+                group = (obj,)
+            for slice_ in group:
+                for index in range(*get_indices(slice_)):
+                    additions[index] = additions.get(index, "") + style
+        self._extend_styles(additions)
         return self
 
-    def multicolor_c(self, sequence: str, *coordinates: tuple[int, int]) -> Self:
-        def transform(coordinates):
-            for obj in coordinates:
-                if isinstance(obj, tuple) and isinstance(obj[0], tuple):
-                    yield tuple(self._coord_to_slice(coord) for coord in obj)
-                else:
-                    yield self._coord_to_slice(obj)
-
-        if not coordinates:
-            coordinates = self._get_all_coords()
-        return self.multicolor(sequence, *transform(coordinates))
+    def multicolor_c(
+        self,
+        sequence: "str | MulticolorProgram",
+        *coordinates: tuple[int, int],
+        seed: int | Random | None = None,
+    ) -> Self:
+        """`multicolor` using (x, y) coordinates, useful for multiline strings."""
+        if coordinates:
+            return self.multicolor(sequence, *self.coords_to_slices(*coordinates), seed=seed)
+        slices = tuple(
+            (index, index + 1)
+            for start, length in zip(*self._get_line_index())
+            for index in range(start, start + length)
+        )
+        return self.multicolor(sequence, *slices, seed=seed)
+
+    @classmethod
+    def render_many(
+        cls,
+        lines: Iterable[str],
+        operations: Iterable[str | tuple[str] | tuple[str, Sequence] | tuple[str, Sequence, dict]],
+        workers: int | None = None,
+        executor: Literal["process", "thread"] | Executor = "process",
+        chunk_size: int | None = None,
+    ) -> list[str]:
+        """
+        Applies the same styling operations to every line and returns the
+        rendered lines in order.
+
+        Each operation is a method name, optionally followed by its positional
+        and keyword arguments, e.g. `("fg_24b_w", (255, 0, 0, "ERROR"))`, of
+        a method styling the string in place (`fm`, `fg_24b_w`, `rainbow`, ...);
+        others raise `ValueError`.
+        Lines are sent in chunks to a process pool (or a thread pool, or the
+        given `Executor`); below `PARALLEL_THRESHOLD` lines, or with a single
+        worker, they are rendered serially.
+
+        Usage:
+            >>> ANSIString.render_many(lines, [("fg_24b_w", (255, 0, 0, "ERROR")), ("rainbow",)])
+        """
+        if isinstance(executor, str) and executor not in ("process", "thread"):
+            raise ValueError(f"unknown executor {executor!r} (expected 'process' or 'thread')")
+        lines = list(lines)
+        operations = _normalize_operations(operations)
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if len(lines) < PARALLEL_THRESHOLD or workers <= 1 and isinstance(executor, str):
+            return _render_chunk(lines, operations)
+
+        if chunk_size is None:
+            chunk_size = max(256, -(-len(lines) // (workers * 4)))
+        chunks = [lines[index:index + chunk_size] for index in range(0, len(lines), chunk_size)]
+        if isinstance(executor, Executor):
+            results = executor.map(_render_chunk, chunks, [operations] * len(chunks))
+            return [line for chunk in results for line in chunk]
+        pool_class = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+        with pool_class(max_workers=workers) as pool:
+            results = pool.map(_render_chunk, chunks, [operations] * len(chunks))
+            return [line for chunk in results for line in chunk]
 
     def join(self, iterable: list[str], /) -> "ANSIString":
         styles, increment = {}, 0
@@ -769,7 +1654,7 @@ class ANSIString(str):
             styles.update(
                 {increment + index: style for index, style in self.styles.items()}
             )
-            if type(string) == ANSIString:
+            if isinstance(string, ANSIString):
                 styles.update(
                     {
                         increment + index - len(string): style
@@ -778,17 +1663,115 @@ class ANSIString(str):
                 )
         return type(self)(super().join(iterable), StyleDict(styles))
 
+    def format(self, *args: Any, **kwargs: Any) -> "ANSIString":
+        """
+        `str.format` keeping the styles: the text between the replacement
+        fields keeps its styles and each value takes the style of its field's
+        opening brace (`ANSIString` values keep their own styles on top of it).
+
+        Use a `StyledTemplate` to fill the same string many times.
+        """
+        from pyansistring.template import StyledTemplate
+
+        return StyledTemplate(self).format(*args, **kwargs)
+
+    def format_map(self, mapping: Mapping[str, Any], /) -> "ANSIString":
+        """`str.format_map` keeping the styles (see `format`)."""
+        from pyansistring.template import StyledTemplate
+
+        return StyledTemplate(self).format_map(mapping)
+
     def ljust(self, width: int, fillchar: str = " ") -> "ANSIString":
-        return self + fillchar * (width - len(self))
+        return self + fillchar * (width - self.display_width)
 
     def rjust(self, width: int, fillchar: str = " ") -> "ANSIString":
-        return fillchar * (width - len(self)) + self
+        return fillchar * (width - self.display_width) + self
 
     def center(self, width: int, fillchar: str = " ") -> "ANSIString":
-        margin = width - len(self)
+        margin = width - self.display_width
         left = (margin // 2) + (margin & width & 1)
         return fillchar * left + self + fillchar * (margin - left)
 
+    def truncate(self, width: int, placeholder: str = "…") -> "ANSIString":
+        """
+        Returns the string cut to fit in `width` terminal columns, ending with
+        the placeholder (counted in the width) if it has been cut.
+        """
+        if self.display_width <= width:
+            return self[:]
+        placeholder_width = display_width(placeholder)
+        if placeholder_width > width:
+            return self[:0] + placeholder[:fit_width(placeholder, width)]
+        return self[:fit_width(self.plain, width - placeholder_width)] + placeholder
+
+    def _slice_styles(
+        self, spans: Iterable[tuple[int, int]], styles: dict[int, str] | None = None
+    ) -> list[dict[int, str]]:
+        """Returns the styles (`styles` if given) of each span (in ascending order), relative to its start."""
+        if styles is None:
+            styles = self.styles
+        indices, result, stop_position = sorted(styles), [], 0
+        for start, stop in spans:
+            start_position = bisect_left(indices, start, stop_position)
+            stop_position = bisect_left(indices, stop, start_position)
+            result.append({
+                index - start: styles[index] for index in indices[start_position:stop_position]
+            })
+        return result
+
+    def wrap(self, width: int = 70) -> list["ANSIString"]:
+        """
+        Wraps the string to `width` terminal columns and returns its lines
+        with their styles (see `wrap_spans`; unlike `textwrap.wrap`, the line
+        breaks of the string are kept).
+        """
+        spans = wrap_spans(self.plain, width)
+        plain, cls = self.plain, type(self)
+        return [
+            cls(plain[start:stop], styles)
+            for (start, stop), styles in zip(spans, self._slice_styles(spans))
+        ]
+
+    def fill(self, width: int = 70) -> "ANSIString":
+        """Wraps the string to `width` terminal columns and returns it as one string (see `wrap`)."""
+        spans = wrap_spans(self.plain, width)
+        plain, parts, styles, offset = self.plain, [], {}, 0
+        for (start, stop), span_styles in zip(spans, self._slice_styles(spans)):
+            parts.append(plain[start:stop])
+            styles.update({offset + index: style for index, style in span_styles.items()})
+            offset += stop - start + 1
+        return type(self)("\n".join(parts), StyleDict(styles))
+
+    def shorten(self, width: int, placeholder: str = " [...]") -> "ANSIString":
+        """
+        Collapses the whitespace of the string and, if it is still wider than
+        `width` terminal columns, drops its last words to fit them and the
+        placeholder in `width`, as `textwrap.shorten`.
+        """
+        if display_width(placeholder.lstrip()) > width:
+            raise ValueError("placeholder too large for max width")
+        plain = self.plain
+        words = [match.span() for match in re.finditer(r"\S+", plain)]
+        widths = [display_width(plain[start:stop]) for start, stop in words]
+        if sum(widths) + len(words) - 1 <= width:
+            kept, placeholder = len(words), ""
+        else:
+            budget, total, kept = width - display_width(placeholder), -1, 0
+            for word_width in widths:
+                total += 1 + word_width
+                if total > budget:
+                    break
+                kept += 1
+        if not kept and placeholder:
+            return type(self)(placeholder.lstrip())
+
+        parts, styles, offset = [], {}, 0
+        for (start, stop), span_styles in zip(words[:kept], self._slice_styles(words[:kept])):
+            parts.append(plain[start:stop])
+            styles.update({offset + index: style for index, style in span_styles.items()})
+            offset += stop - start + 1
+        return type(self)(" ".join(parts), StyleDict(styles)) + placeholder
+
     def rsplit(self, sep: str | None = None, maxsplit: int = -1) -> list["ANSIString"]:
         actual = super().rsplit(sep, maxsplit)
         max_index = len(self)
@@ -838,3 +1821,105 @@ class ANSIString(str):
             actual[no] = type(self)(string, StyleDict(styles))
             min_index += len(string) + (0 if keepends else 1)
         return actual
+
+
+class FrozenANSIString(ANSIString):
+    r"""
+    An immutable, hashable `ANSIString`, e.g. for keys of `functools.lru_cache`,
+    memo tables or sets.
+
+    Its styles are a `FrozenStyleDict`, so the styling methods (`fm`, `fg_4b`,
+    `rainbow`, ...) raise `TypeError`, while the methods returning new strings
+    (`upper`, `+`, slicing, `wrap`, ...) return `FrozenANSIString`s.
+
+    The hash is structural: computed once from `plain` and `style_runs`,
+    without rendering (that of `plain` without styles, as it then equals
+    it). The render is computed once, then cached for good.
+
+    Properties:
+        style_runs: the styles as a tuple of `(start, stop, style)` runs of
+        consecutive chars sharing a style.
+
+    Note:
+        *Two `ANSIString`s are equal if their renders are, a `FrozenANSIString`
+        and another `ANSIString` if their `plain` and `styles` are. To keep its
+        hash consistent, a `FrozenANSIString` only equals a `str` without
+        styles, if it is its `plain` (not its render).
+
+    Usage:
+        >>> @lru_cache
+        ... def boxed(title: FrozenANSIString) -> str: ...
+        >>> boxed(ANSIString("Title").fm(SGR.BOLD).freeze())
+        >>> mutable = frozen.thaw().fg_4b(Foreground.RED)
+    """
+
+    def __new__(cls, string: str = "", styles: StyleDict | dict[int, str] | None = None) -> Self:
+        if not isinstance(styles, FrozenStyleDict):
+            styles = FrozenStyleDict(styles or {})
+        obj = super().__new__(cls, string, styles)
+        obj._styles = styles  # kept even if empty
+        obj._style_runs = None
+        obj._hash = None
+        return obj
+
+    @property
+    def styled(self) -> str:
+        cached = self._styled
+        if cached is None:
+            rendered = self._render() if _render_cache is None else _render_cache.render(self)
+            cached = self._styled = (self._styles._version, rendered)
+        return cached[1]
+
+    @property
+    def style_runs(self) -> tuple[tuple[int, int, str], ...]:
+        if self._style_runs is None:
+            runs, styles = [], self._styles
+            for index in sorted(styles):
+                style = styles[index]
+                if runs and runs[-1][1] == index and runs[-1][2] == style:
+                    runs[-1][1] += 1
+                else:
+                    runs.append([index, index + 1, style])
+            self._style_runs = tuple(map(tuple, runs))
+        return self._style_runs
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            self._hash = hash((self.plain, self.style_runs)) if self._styles else str.__hash__(self.plain)
+        return self._hash
+
+    def __eq__(self, value: object) -> bool:
+        if isinstance(value, FrozenANSIString):
+            return (
+                hash(self) == hash(value)
+                and self.plain == value.plain
+                and self.style_runs == value.style_runs
+            )
+        elif isinstance(value, ANSIString):
+            return self.plain == value.plain and dict.__eq__(self._styles, value.styles)
+        return not self._styles and self.plain == value
+
+    def __ne__(self, value: object) -> bool:
+        return not self == value
+
+    def __repr__(self) -> str:
+        return f"FrozenANSIString({str.__repr__(self.plain)}, {self.styles if self.styles else None})"
+
+    def _extend_styles(self, additions: dict[int, str]) -> None:
+        raise TypeError("'FrozenANSIString' object is immutable (use thaw() for a mutable copy)")
+
+    def freeze(self) -> "FrozenANSIString":
+        return self
+
+
+def _immutable_method(name: str) -> Callable:
+    def method(self: FrozenANSIString, *args: Any, **kwargs: Any) -> Any:
+        raise TypeError(f"'FrozenANSIString' object is immutable (use thaw().{name}() for a styled copy)")
+
+    method.__name__ = method.__qualname__ = name
+    return method
+
+
+for _name in _STYLING_METHODS:
+    setattr(FrozenANSIString, _name, _immutable_method(_name))
+del _name
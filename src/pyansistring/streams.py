@@ -0,0 +1,407 @@
+__all__ = [
+    "ANSIWriter",
+    "AsyncANSIWriter",
+    "write_async",
+]
+
+import asyncio
+import io
+import sys
+import threading
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Executor
+from time import monotonic
+from typing import IO, Any, Literal, Protocol, Self
+
+from pyansistring.pyansistring import ANSIString
+
+RESET = "\x1b[0m"
+
+
+class SupportsANSIString(Protocol):
+    """Builders of `ANSIString`s, such as `ANSICanvas`."""
+
+    def to_ansistring(self) -> ANSIString: ...
+
+
+class SupportsDrain(Protocol):
+    """Asynchronous byte streams, such as `asyncio.StreamWriter`."""
+
+    def write(self, data: bytes) -> Any: ...
+
+    async def drain(self) -> None: ...
+
+
+class _StyledBuffer:
+    """The buffering, compact rendering and flush policy shared by the writers."""
+
+    def __init__(
+        self,
+        buffer_size: int,
+        flush_interval: float | None,
+        line_buffered: bool,
+        compact: bool,
+        encoding: str,
+        color_depth: Literal[24, 8, 4, 0],
+    ) -> None:
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.line_buffered = line_buffered
+        self.compact = compact
+        self.encoding = encoding
+        self.color_depth = color_depth
+        self.bytes_written = 0
+        self.flushes = 0
+        self._parts: list[str] = []
+        self._size = 0
+        self._style: str | None = None  # style of the open run
+        self._pending = ""  # line breaks after the open run, written in it if it continues
+        self._last_flush = monotonic()
+        # pending timed flush (of `flush_interval`)
+        self._timer: threading.Timer | asyncio.TimerHandle | asyncio.Task | None = None
+
+    def _flush_delay(self) -> float | None:
+        """Returns the delay of the timed flush to schedule, if any."""
+        if self.flush_interval is None or self._timer is not None or not self._parts:
+            return None
+        return max(0.0, self.flush_interval - (monotonic() - self._last_flush))
+
+    def _append(self, string: str | ANSIString) -> bool:
+        """Buffers the string and returns whether the buffer should be flushed."""
+        plain = string.plain if isinstance(string, ANSIString) else string
+        styles = string._downgraded_styles(self.color_depth) if isinstance(string, ANSIString) else None
+        parts = self._parts
+        start = len(parts)
+        if not self.compact:
+            if self._style is not None:
+                self._close()
+            parts.append(string.render(self.color_depth) if styles else plain)
+        elif styles:
+            self._write_runs(plain, styles)
+        else:
+            self._write_gap(plain)
+        self._size += sum(map(len, parts[start:]))
+        return (
+            self._size >= self.buffer_size
+            or self.line_buffered and "\n" in plain
+            or self.flush_interval is not None
+            and monotonic() - self._last_flush >= self.flush_interval
+        )
+
+    def _close(self) -> None:
+        self._parts.append(RESET + self._pending)
+        self._style, self._pending = None, ""
+
+    def _write_gap(self, gap: str) -> None:
+        """Writes unstyled text, which keeps the open run when it only has line breaks."""
+        if not gap:
+            return
+        if self._style is None:
+            self._parts.append(gap)
+        elif not gap.strip("\r\n"):
+            self._pending += gap
+        else:
+            self._close()
+            self._parts.append(gap)
+
+    def _write_runs(self, plain: str, styles: dict[int, str]) -> None:
+        # runs of consecutive indices sharing a style: (start, stop, style)
+        runs, start, stop, current = [], 0, -1, None
+        for index in sorted(styles):
+            style = styles[index]
+            if index == stop and style == current:
+                stop += 1
+            else:
+                if current is not None:
+                    runs.append((start, stop, current))
+                start, stop, current = index, index + 1, style
+        if current is not None:
+            runs.append((start, stop, current))
+
+        parts, position, length = self._parts, 0, len(plain)
+        for start, stop, style in runs:
+            if start >= length:
+                break
+            self._write_gap(plain[position:start])
+            if style != self._style:
+                if self._style is not None:
+                    parts.append(RESET)
+                parts.append(self._pending + style)
+                self._style, self._pending = style, ""
+            elif self._pending:
+                parts.append(self._pending)
+                self._pending = ""
+            parts.append(plain[start:stop])
+            position = stop
+        self._write_gap(plain[position:])
+
+    def _take(self) -> str:
+        """Empties the buffer (resetting the open style) and returns its content."""
+        if self._style is not None:
+            self._close()
+        self._last_flush = monotonic()
+        data = "".join(self._parts)
+        self._parts.clear()
+        self._size = 0
+        return data
+
+
+class ANSIWriter(_StyledBuffer):
+    r"""
+    A buffered sink for `ANSIString`s with a flush policy, for high-rate
+    output such as live log tails.
+
+    Strings are rendered straight from `plain` and `styles` into a reusable
+    buffer that is written to the file object in one call when the buffer
+    exceeds `buffer_size` characters, when `flush_interval` seconds have
+    passed since the last flush (on a write, or from a timer thread while
+    output is buffered), or on a line break with `line_buffered`.
+
+    With `compact` rendering, a style is emitted once per run of characters
+    sharing it instead of once per character, and runs continue over line
+    breaks and across `write` calls (a style open at a flush is reset).
+    Colors are converted to `color_depth` (see `ANSIString.render`).
+
+    Instance Attributes:
+        bytes_written: number of bytes written to the file object.
+        flushes: number of writes to the file object.
+
+    Usage:
+        >>> with ANSIWriter(sys.stdout, flush_interval=0.05) as writer:
+        ...     for line in lines:
+        ...         writer.write(highlighter(line + "\n"))
+    """
+
+    def __init__(
+        self,
+        fp: IO | None = None,
+        buffer_size: int = 65536,
+        flush_interval: float | None = None,
+        line_buffered: bool = False,
+        compact: bool = True,
+        encoding: str | None = None,
+        color_depth: Literal[24, 8, 4, 0] = 24,
+    ) -> None:
+        self.fp = sys.stdout if fp is None else fp
+        mode = getattr(self.fp, "mode", "")
+        self.binary = (
+            isinstance(self.fp, (io.RawIOBase, io.BufferedIOBase))
+            or isinstance(mode, str) and "b" in mode
+        )
+        super().__init__(
+            buffer_size, flush_interval, line_buffered, compact,
+            encoding or getattr(self.fp, "encoding", None) or "utf-8", color_depth,
+        )
+        self._lock = threading.Lock()
+
+    def write(self, string: str | ANSIString | SupportsANSIString) -> int:
+        """Buffers the string (flushing by policy) and returns its length."""
+        if not isinstance(string, str):
+            string = string.to_ansistring()
+        with self._lock:
+            if self._append(string):
+                self._flush()
+            elif (delay := self._flush_delay()) is not None:
+                self._timer = threading.Timer(delay, self._timed_flush)
+                self._timer.daemon = True
+                self._timer.start()
+        return len(string)
+
+    def writelines(self, strings: Iterable[str | ANSIString | SupportsANSIString]) -> None:
+        for string in strings:
+            self.write(string)
+
+    def _timed_flush(self) -> None:
+        with self._lock:
+            self._timer = None
+            self._flush()
+
+    def flush(self) -> None:
+        """Writes the buffer to the file object (resetting the open style) and flushes it."""
+        with self._lock:
+            self._flush()
+
+    def _flush(self) -> None:
+        data = self._take()
+        if not data:
+            return
+        if self.binary:
+            data = data.encode(self.encoding)
+            self.bytes_written += len(data)
+        else:
+            self.bytes_written += len(data) if data.isascii() else len(data.encode(self.encoding))
+        self.fp.write(data)
+        self.fp.flush()
+        self.flushes += 1
+
+    def close(self) -> None:
+        """Flushes the buffer (the file object is left open)."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._flush()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return (
+            f"ANSIWriter({self.fp!r}, bytes_written={self.bytes_written}, "
+            f"flushes={self.flushes})"
+        )
+
+
+def _next_encoded(chunks: Iterator[str], encoding: str) -> bytes | None:
+    chunk = next(chunks, None)
+    return None if chunk is None else chunk.encode(encoding)
+
+
+async def write_async(
+    writer: SupportsDrain,
+    string: str | ANSIString | SupportsANSIString,
+    chunk_size: int = 65536,
+    encoding: str = "utf-8",
+    color_depth: Literal[24, 8, 4, 0] = 24,
+    offload_threshold: int | None = None,
+    executor: Executor | None = None,
+) -> int:
+    """
+    Writes the rendered string to the stream in chunks of at most
+    `chunk_size` characters of `plain` (see `ANSIString.iter_render`),
+    awaiting `drain()` after every chunk, so that the event loop is blocked
+    for one chunk at a time at most and the stream's backpressure applies.
+
+    Strings of `offload_threshold` characters or more are rendered in the
+    executor (the default one of the loop if `None`).
+
+    Returns the number of bytes written.
+    """
+    if not isinstance(string, str):
+        string = string.to_ansistring()
+    if not isinstance(string, ANSIString):
+        string = ANSIString(string)
+    chunks = string.iter_render(chunk_size, color_depth)
+    offload = offload_threshold is not None and len(string) >= offload_threshold
+    loop = asyncio.get_running_loop()
+    written = 0
+    while True:
+        if offload:
+            data = await loop.run_in_executor(executor, _next_encoded, chunks, encoding)
+        else:
+            data = _next_encoded(chunks, encoding)
+        if data is None:
+            return written
+        writer.write(data)
+        written += len(data)
+        await writer.drain()
+        if not offload:
+            await asyncio.sleep(0)  # drain() returns at once below the high-water mark
+
+
+class AsyncANSIWriter(_StyledBuffer):
+    r"""
+    An `ANSIWriter` for asynchronous byte streams such as
+    `asyncio.StreamWriter`: writes are buffered with the same compact
+    rendering and flush policy, and flushes await `drain()`.
+
+    The timed flushes of `flush_interval` are scheduled on the running
+    event loop. Writes and flushes hold a lock, so tasks sharing the writer
+    never interleave their output (even while a long string is streamed).
+
+    Strings longer than `buffer_size` characters are not buffered but
+    streamed in chunks with `write_async` (rendered in `executor` from
+    `offload_threshold` characters).
+
+    Usage:
+        >>> async with AsyncANSIWriter(stream_writer, flush_interval=0.05) as writer:
+        ...     async for line in lines:
+        ...         await writer.write(highlighter(line + "\n"))
+    """
+
+    def __init__(
+        self,
+        writer: SupportsDrain,
+        buffer_size: int = 65536,
+        flush_interval: float | None = None,
+        line_buffered: bool = False,
+        compact: bool = True,
+        encoding: str = "utf-8",
+        color_depth: Literal[24, 8, 4, 0] = 24,
+        offload_threshold: int | None = None,
+        executor: Executor | None = None,
+    ) -> None:
+        super().__init__(buffer_size, flush_interval, line_buffered, compact, encoding, color_depth)
+        self.writer = writer
+        self.offload_threshold = offload_threshold
+        self.executor = executor
+        self._lock = asyncio.Lock()
+
+    async def write(self, string: str | ANSIString | SupportsANSIString) -> int:
+        """Buffers the string (flushing by policy) and returns its length."""
+        if not isinstance(string, str):
+            string = string.to_ansistring()
+        async with self._lock:
+            if len(string) > self.buffer_size:
+                await self._flush()
+                self.bytes_written += await write_async(
+                    self.writer, string, self.buffer_size, self.encoding, self.color_depth,
+                    self.offload_threshold, self.executor,
+                )
+                self.flushes += 1
+            elif self._append(string):
+                await self._flush()
+            elif (delay := self._flush_delay()) is not None:
+                self._timer = asyncio.get_running_loop().call_later(delay, self._timed_flush)
+        return len(string)
+
+    def _timed_flush(self) -> None:
+        self._timer = asyncio.ensure_future(self.flush())
+        self._timer.add_done_callback(self._timed_flush_done)
+
+    def _timed_flush_done(self, task: asyncio.Task) -> None:
+        if self._timer is task:
+            self._timer = None
+
+    async def writelines(self, strings: Iterable[str | ANSIString | SupportsANSIString]) -> None:
+        for string in strings:
+            await self.write(string)
+
+    async def flush(self) -> None:
+        """Writes the buffer to the stream (resetting the open style) and drains it."""
+        async with self._lock:
+            await self._flush()
+
+    async def _flush(self) -> None:
+        data = self._take()
+        if not data:
+            return
+        data = data.encode(self.encoding)
+        self.writer.write(data)
+        self.bytes_written += len(data)
+        self.flushes += 1
+        await self.writer.drain()
+
+    async def aclose(self) -> None:
+        """Flushes the buffer (the stream is left open)."""
+        if isinstance(self._timer, asyncio.TimerHandle):
+            self._timer.cancel()
+            self._timer = None
+        elif self._timer is not None:
+            await self._timer
+        await self.flush()
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    def __repr__(self) -> str:
+        return (
+            f"AsyncANSIWriter({self.writer!r}, bytes_written={self.bytes_written}, "
+            f"flushes={self.flushes})"
+        )
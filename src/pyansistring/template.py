@@ -0,0 +1,216 @@
+__all__ = [
+    "StyledTemplate",
+]
+
+import re
+import string
+from collections.abc import Mapping, Sequence
+from typing import Any, NamedTuple
+
+from pyansistring.pyansistring import ANSIString, StyleDict
+
+RESET = "\x1b[0m"
+
+# A replacement field (with nested fields in its format spec), an escaped brace or a single brace
+_FIELD_PATTERN = re.compile(
+    r"\{\{|\}\}"
+    r"|\{(?P<name>[^{}!:]*)(?:!(?P<conversion>[^{}:]*))?(?::(?P<spec>(?:[^{}]|\{[^{}]*\})*))?\}"
+    r"|[{}]"
+)
+# A replacement field nested in a format spec
+_NESTED_FIELD_PATTERN = re.compile(r"\{(?P<name>[^{}!:]*)(?:!(?P<conversion>[^{}:]*))?(?::(?P<spec>[^{}]*))?\}")
+_CONVERSIONS = {"r": repr, "s": str, "a": ascii}
+_FORMATTER = string.Formatter()
+
+
+class _Field(NamedTuple):
+    key: int | str  # positional index or keyword
+    name: str | None  # the full field name, for attribute and item lookups
+    conversion: str | None
+    spec: "str | tuple[str | _Field, ...]"  # literal parts and nested fields, if any
+    style: str
+
+
+class StyledTemplate:
+    r"""
+    An `ANSIString` with `str.format` replacement fields, compiled once to
+    be filled many times.
+
+    The text between the fields is rendered with its styles at compilation,
+    so filling the template (`render`) only formats the values and joins them
+    with the pre-rendered segments. Each value is styled as one run with the
+    style of its field in `field_styles` (SGR parameters by field name as
+    written in the template, e.g. `"0"` or `"user.name"`) or, otherwise, the
+    style of the field's opening brace in the template. `ANSIString` values
+    keep their own styles on top of it.
+
+    Replacement fields can be nested in format specs (as in `"{value:{width}}"`),
+    one level deep like with `str.format`.
+
+    Usage:
+        >>> status = StyledTemplate(
+        ...     ANSIString("[{done:>3}/{total}] {name}").fm(SGR.DIM),
+        ...     field_styles={"done": Foreground.GREEN, "name": SGR.BOLD},
+        ... )
+        >>> for done, name in enumerate(names, 1):
+        ...     print(status.render(done=done, total=len(names), name=name))
+    """
+
+    def __init__(
+        self,
+        template: str | ANSIString,
+        field_styles: Mapping[str, int | str | Sequence[int | str]] | None = None,
+    ) -> None:
+        if not isinstance(template, ANSIString):
+            template = ANSIString(template)
+        self.template = template
+        escapes = {
+            name: "".join(
+                f"\x1b[{parameter}m"
+                for parameter in ((parameters,) if isinstance(parameters, (int, str)) else parameters)
+            )
+            for name, parameters in (field_styles or {}).items()
+        }
+        plain, styles = template.plain, template.styles
+        # pre-rendered static segments (str) and fields, in order
+        self._segments: list[str | _Field] = []
+        # static segments as (plain, styles), for `format`
+        self._statics: list[tuple[str, dict[int, str]]] = []
+        static: list[int] = []  # indices of the template in the current static segment
+        position, auto_number, next_number = 0, None, 0
+
+        def resolve(match: re.Match[str]) -> tuple[int | str, str, str | None]:
+            """
+            Returns the key, the name (numbered if automatic) and the path (the
+            name for attribute and item lookups, else `None`) of a field.
+            """
+            nonlocal auto_number, next_number
+            name, conversion = match["name"], match["conversion"]
+            if conversion is not None and conversion not in _CONVERSIONS:
+                raise ValueError(f"Unknown conversion specifier {conversion!r}")
+            first = re.match(r"[^.[]*", name)[0]
+            if not first:
+                if auto_number is False:
+                    raise ValueError("cannot switch from manual field specification to automatic field numbering")
+                key, auto_number, next_number = next_number, True, next_number + 1
+                first, name = str(key), f"{key}{name}"
+            elif first.isdigit():
+                if auto_number:
+                    raise ValueError("cannot switch from automatic field numbering to manual field specification")
+                key, auto_number = int(first), False
+            else:
+                key = first
+            return key, name, name if name != first else None
+
+        for match in _FIELD_PATTERN.finditer(plain):
+            static.extend(range(position, match.start()))
+            position = match.end()
+            token = match[0]
+            if token in ("{{", "}}"):
+                static.append(match.start())
+                continue
+            elif token in ("{", "}"):
+                raise ValueError(f"Single '{token}' encountered in format string")
+            self._add_static(plain, styles, static)
+            static = []
+
+            key, name, path = resolve(match)
+            spec = match["spec"] or ""
+            if "{" in spec:
+                # literal parts and nested fields, numbered after the field as by `str.format`
+                parts, spec_position = [], 0
+                for nested in _NESTED_FIELD_PATTERN.finditer(spec):
+                    nested_key, _, nested_path = resolve(nested)
+                    parts.append(spec[spec_position:nested.start()])
+                    parts.append(_Field(nested_key, nested_path, nested["conversion"], nested["spec"] or "", ""))
+                    spec_position = nested.end()
+                parts.append(spec[spec_position:])
+                spec = tuple(parts)
+            style = escapes.get(name, styles.get(match.start(), ""))
+            self._segments.append(_Field(key, path, match["conversion"], spec, style))
+        static.extend(range(position, len(plain)))
+        self._add_static(plain, styles, static)
+
+    def _add_static(self, plain: str, styles: dict[int, str], indices: list[int]) -> None:
+        if not indices:
+            return
+        text = "".join(plain[index] for index in indices)
+        static_styles = {new: styles[old] for new, old in enumerate(indices) if old in styles}
+        self._segments.append(ANSIString(text, static_styles).styled)
+        self._statics.append((text, static_styles))
+
+    @classmethod
+    def _value(cls, field: _Field, args: Sequence[Any], kwargs: Mapping[str, Any]) -> Any:
+        if field.name is not None:
+            value = _FORMATTER.get_field(field.name, args, kwargs)[0]
+        else:
+            value = args[field.key] if isinstance(field.key, int) else kwargs[field.key]
+        spec = field.spec
+        if type(spec) is not str:
+            spec = "".join(
+                part if type(part) is str else str(cls._value(part, args, kwargs)) for part in spec
+            )
+        if field.conversion is not None:
+            value = _CONVERSIONS[field.conversion](value)
+        elif not spec and isinstance(value, ANSIString):
+            return value
+        return format(value, spec)
+
+    def render_map(self, mapping: Mapping[str, Any]) -> str:
+        """Fills the template with the values of the mapping and returns the rendered string."""
+        return self._render((), mapping)
+
+    def render(self, *args: Any, **kwargs: Any) -> str:
+        """Fills the template with the values (as `str.format`) and returns the rendered string."""
+        return self._render(args, kwargs)
+
+    def _render(self, args: Sequence[Any], kwargs: Mapping[str, Any]) -> str:
+        parts = []
+        for segment in self._segments:
+            if type(segment) is str:
+                parts.append(segment)
+                continue
+            text = self._value(segment, args, kwargs)
+            if isinstance(text, ANSIString):
+                parts.append(
+                    text._render({index: segment.style + text.styles.get(index, "") for index in range(len(text))})
+                    if segment.style
+                    else text.styled
+                )
+            elif segment.style and text:
+                parts.append(f"{segment.style}{text}{RESET}")
+            else:
+                parts.append(text)
+        return "".join(parts)
+
+    def format_map(self, mapping: Mapping[str, Any]) -> ANSIString:
+        """Fills the template with the values of the mapping and returns an `ANSIString`."""
+        return self._format((), mapping)
+
+    def format(self, *args: Any, **kwargs: Any) -> ANSIString:
+        """Fills the template with the values (as `str.format`) and returns an `ANSIString`."""
+        return self._format(args, kwargs)
+
+    def _format(self, args: Sequence[Any], kwargs: Mapping[str, Any]) -> ANSIString:
+        parts, styles, length = [], {}, 0
+        statics = iter(self._statics)
+        for segment in self._segments:
+            if type(segment) is str:
+                text, static_styles = next(statics)
+                styles.update({length + index: style for index, style in static_styles.items()})
+            else:
+                text = self._value(segment, args, kwargs)
+                value_styles = text.styles if isinstance(text, ANSIString) else {}
+                if segment.style or value_styles:
+                    styles.update({
+                        length + index: segment.style + value_styles.get(index, "")
+                        for index in range(len(text))
+                        if segment.style or index in value_styles
+                    })
+                text = str.__str__(text)
+            parts.append(text)
+            length += len(text)
+        return ANSIString("".join(parts), StyleDict(styles))
+
+    def __repr__(self) -> str:
+        return f"StyledTemplate({self.template!r})"
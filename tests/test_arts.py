@@ -0,0 +1,37 @@
+import os
+import tempfile
+import unittest
+from random import Random
+
+from pyansistring import ANSIString
+from pyansistring.arts import COLORED_ARTS, PLAIN_ARTS, STYLES, ArtRegistry
+
+
+class ArtRegistryTest(unittest.TestCase):
+    def test_lazy_resolution(self):
+        arts = ArtRegistry(PLAIN_ARTS, STYLES, seed=5)
+        self.assertEqual(arts._colored, {})
+        self.assertEqual(list(arts), list(PLAIN_ARTS))
+        expected = ANSIString(PLAIN_ARTS["BANNER"])
+        rng = Random(5)
+        for sequence, coordinates in STYLES["BANNER"].items():
+            expected.multicolor_c(sequence, *coordinates, seed=rng)
+        self.assertEqual(arts["BANNER"], expected)
+        self.assertIs(arts["BANNER"], arts["BANNER"])
+        self.assertEqual(arts["LETTER"], ANSIString(PLAIN_ARTS["LETTER"]))
+        self.assertEqual(COLORED_ARTS["BANNER"].plain, PLAIN_ARTS["BANNER"])
+
+    def test_disk_cache(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            colored = ArtRegistry(PLAIN_ARTS, STYLES, seed=1, cache_dir=cache_dir)["BANNER"]
+            arts = ArtRegistry(PLAIN_ARTS, STYLES, seed=1, cache_dir=cache_dir)
+            path = os.path.join(cache_dir, f"BANNER-{arts.program_hash('BANNER')}-1.json")
+            self.assertTrue(os.path.exists(path))
+            arts._color = None
+            self.assertEqual(arts["BANNER"], colored)
+            ArtRegistry(PLAIN_ARTS, STYLES, cache_dir=cache_dir)["BANNER"]
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+
+from pyansistring import ANSICanvas, ANSIString
+from pyansistring.constants import SGR, Foreground
+from pyansistring.helpers import HUE_STYLES
+
+BOLD = f"\x1b[{SGR.BOLD.value}m"
+RED = HUE_STYLES[0].fg
+
+
+class ANSICanvasTest(unittest.TestCase):
+    def test_set_fill_put(self):
+        canvas = ANSICanvas(4, 2, ".")
+        canvas.set(1, 0, BOLD, "x").fill(2, 0, 5, 5, "#", RED).put(-1, 1, "abc")
+        self.assertEqual(canvas.to_ansistring().plain, ".x##\nbc##")
+        self.assertEqual(canvas.get(1, 0), ("x", BOLD))
+        self.assertEqual(canvas.get(0, 1), ("b", None))
+        self.assertEqual(
+            str(canvas),
+            f".{BOLD}x\x1b[0m{RED}#\x1b[0m{RED}#\x1b[0m\nbc{RED}#\x1b[0m{RED}#\x1b[0m",
+        )
+        canvas.set(1, 0, None)
+        self.assertEqual(canvas.render_row(0), f".x{RED}#\x1b[0m{RED}#\x1b[0m")
+        self.assertRaises(IndexError, canvas.set, 4, 0, BOLD)
+        self.assertRaises(IndexError, canvas.get, 0, -1)
+
+    def test_cells(self):
+        canvas = ANSICanvas(4, 3, ".")
+        self.assertRaises(ValueError, canvas.fill, 0, 0, 2, 1, "ab")
+        self.assertRaises(ValueError, canvas.set, 1, 0, None, "xyz")
+        self.assertRaises(ValueError, canvas.set, 1, 0, None, "")
+        canvas.put(1, 1, "ab\ncde\r\nfg", BOLD)
+        self.assertEqual(canvas.to_ansistring().plain, "....\n.ab.\n.cde")
+        self.assertEqual(canvas.get(3, 2), ("e", BOLD))
+
+    def test_blit(self):
+        sprite = ANSICanvas(2, 2, "o").fill(0, 0, 1, 2, style=BOLD)
+        canvas = ANSICanvas(3, 3).blit(sprite, 2, -1)
+        self.assertEqual(canvas.to_ansistring().plain, "  o\n   \n   ")
+        self.assertEqual(canvas.get(2, 0), ("o", BOLD))
+        canvas.blit(ANSICanvas(3, 3, "-"))
+        self.assertEqual(canvas.to_ansistring(), ANSIString("---\n---\n---"))
+
+    def test_ansistring_roundtrip(self):
+        string = ANSIString("Hello\nWorld!\r\nab").fg_4b(Foreground.RED, slice(3, 9)).fm(SGR.BOLD, slice(14, 15))
+        canvas = ANSICanvas.from_ansistring(string)
+        self.assertEqual((canvas.width, canvas.height), (6, 3))
+        self.assertEqual(canvas.get(4, 0), ("o", f"\x1b[{Foreground.RED.value}m"))
+        self.assertEqual(canvas.get(2, 1), ("r", f"\x1b[{Foreground.RED.value}m"))
+        self.assertEqual(canvas.get(0, 2), ("a", BOLD))
+        padded = canvas.to_ansistring()
+        self.assertEqual(padded.plain, "Hello \nWorld!\nab    ")
+        self.assertEqual(ANSICanvas.from_ansistring(padded).to_ansistring(), padded)
+        self.assertEqual(str(canvas), str(padded))
+
+    def test_render_changed(self):
+        canvas = ANSICanvas(3, 4)
+        self.assertEqual([y for y, _ in canvas.render_changed()], [0, 1, 2, 3])
+        self.assertEqual(list(canvas.render_changed()), [])
+        canvas.set(0, 2, BOLD).put(0, 1, "ab")
+        self.assertEqual(
+            list(canvas.render_changed()),
+            [(1, "ab "), (2, f"{BOLD} \x1b[0m  ")],
+        )
+        self.assertEqual(list(canvas.render_changed()), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import re
+import unittest
+
+from pyansistring import ANSIString, Highlighter
+from pyansistring.constants import SGR, Foreground
+
+BOLD, UNDERLINE, RED, RES = "\x1b[1m", "\x1b[4m", f"\x1b[{Foreground.RED.value}m", "\x1b[0m"
+
+
+def styled(text: str, *styles: str) -> str:
+    return "".join(f"{''.join(styles)}{char}{RES}" for char in text)
+
+
+class HighlighterTest(unittest.TestCase):
+    def test_rules(self):
+        highlighter = Highlighter([
+            (Foreground.RED, r"\bERROR\b"),
+            ({"key": SGR.BOLD, 2: SGR.UNDERLINE}, r"(?P<key>\w+)=(\S+)"),
+        ]).add_words(SGR.UNDERLINE, "get", case_sensitive=False)
+        self.assertEqual(len(highlighter), 3)
+        actual = highlighter("ERROR user=alice GET ERRORS")
+        expected = (
+            styled("ERROR", RED) + " " + styled("user", BOLD) + "=" + styled("alice", UNDERLINE) +
+            " " + styled("GET", UNDERLINE) + " ERRORS"
+        )
+        self.assertEqual(actual, expected)
+        self.assertEqual(highlighter(""), "")
+        self.assertEqual(Highlighter()("x=1"), ANSIString("x=1"))
+
+    def test_priority(self):
+        highlighter = Highlighter([(SGR.BOLD, "ab"), (SGR.UNDERLINE, "abc|b|c"), (SGR.BOLD, "x*")])
+        self.assertEqual(highlighter("abcabc"), styled("ab", BOLD) + styled("c", UNDERLINE) + styled("ab", BOLD) + styled("c", UNDERLINE))
+        string = ANSIString("a-b").fm(SGR.BOLD, (0, 1))
+        self.assertIs(Highlighter([(SGR.UNDERLINE, "a|b")])(string), string)
+        self.assertEqual(string, styled("a", BOLD, UNDERLINE) + "-" + styled("b", UNDERLINE))
+
+    def test_flags(self):
+        highlighter = Highlighter([
+            (SGR.BOLD, re.compile(r"error  # level", re.I | re.X)),
+            (SGR.UNDERLINE, "^done$", re.M),
+        ])
+        self.assertEqual(highlighter("Error\ndone"), styled("Error", BOLD) + "\n" + styled("done", UNDERLINE))
+        self.assertRaises(ValueError, Highlighter().add, SGR.BOLD, re.compile("a"), re.I)
+        self.assertRaises(IndexError, Highlighter().add, {"name": SGR.BOLD}, "(a)")
+        self.assertRaises(re.error, Highlighter().add, SGR.BOLD, "(")
+
+    def test_combined_rules(self):
+        highlighter = Highlighter([(SGR.BOLD, "(?i)(?x) error  # level"), (SGR.UNDERLINE, "done")])
+        self.assertEqual(highlighter("Error DONE done"), styled("Error", BOLD) + " DONE " + styled("done", UNDERLINE))
+        highlighter = Highlighter([(SGR.BOLD, "(?P<key>a)")])
+        self.assertRaises(re.error, highlighter.add, SGR.UNDERLINE, "(?P<key>b)")
+        self.assertEqual(len(highlighter), 1)
+        self.assertEqual(highlighter("ab"), styled("a", BOLD) + "b")
+
+    def test_group_references(self):
+        highlighter = Highlighter([(SGR.BOLD, r"(?P<quote>['\"])\w+(?P=quote)"), (SGR.UNDERLINE, r"(?P<open><)?x(?(open)>)")])
+        for pattern in (r"(a)\1", r"(a)?b(?(1)c|d)", r"(?x) (a) \1"):
+            self.assertRaises(ValueError, highlighter.add, SGR.DIM, pattern)
+        self.assertEqual(len(highlighter), 2)
+        self.assertEqual(highlighter("'ab' <x> x"), styled("'ab'", BOLD) + " " + styled("<x>", UNDERLINE) + " " + styled("x", UNDERLINE))
+
+
+if __name__ == "__main__":
+    unittest.main()
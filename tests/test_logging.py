@@ -0,0 +1,110 @@
+import io
+import logging
+import sys
+import unittest
+
+from pyansistring.constants import SGR, Foreground
+from pyansistring.logging import Formatter, StreamHandler
+
+
+def make_record(level: int, message: str = "hello %s", args: tuple = ("world",)) -> logging.LogRecord:
+    return logging.LogRecord("app", level, __file__, 1, message, args, None)
+
+
+class TTYStream(io.StringIO):
+    def isatty(self) -> bool:
+        return True
+
+
+class FormatterTest(unittest.TestCase):
+    def test_level_styles(self):
+        formatter = Formatter("%(levelname)-7s %(name)s: %(message)s", field_styles={"name": Foreground.BLUE})
+        self.assertEqual(
+            formatter.format(make_record(logging.WARNING)),
+            "\x1b[33mWARNING\x1b[0m \x1b[34mapp\x1b[0m: hello world",
+        )
+        self.assertEqual(
+            formatter.format(make_record(logging.CRITICAL)),
+            "\x1b[31m\x1b[1mCRITICAL\x1b[0m \x1b[34mapp\x1b[0m: hello world",
+        )
+        # custom levels take the style of the closest level below
+        self.assertEqual(
+            formatter.format(make_record(logging.INFO + 5)),
+            "\x1b[32mLevel 25\x1b[0m \x1b[34mapp\x1b[0m: hello world",
+        )
+        self.assertEqual(formatter.format(make_record(logging.WARNING), use_color=False), "WARNING app: hello world")
+        self.assertEqual(
+            Formatter("%(message)s", use_color=False).format(make_record(logging.ERROR)),
+            logging.Formatter("%(message)s").format(make_record(logging.ERROR)),
+        )
+
+    def test_styles(self):
+        record = make_record(logging.ERROR)
+        formatter = Formatter(
+            "{levelname:>6} {message!r}", style="{",
+            level_styles={logging.ERROR: (Foreground.RED, SGR.UNDERLINE)},
+            level_fields=("levelname", "message"),
+        )
+        self.assertEqual(formatter.format(record), "\x1b[31m\x1b[4m ERROR\x1b[0m \x1b[31m\x1b[4m'hello world'\x1b[0m")
+        formatter = Formatter("$levelname ${message}", style="$", color_depth=0)
+        self.assertEqual(formatter.format(record), "ERROR hello world")
+
+    def test_exception(self):
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = logging.LogRecord("app", logging.ERROR, __file__, 1, "failed", (), sys.exc_info())
+        text = Formatter().format(record, use_color=True)
+        self.assertTrue(text.startswith("failed\nTraceback"))
+        self.assertTrue(text.endswith("ValueError: boom"))
+
+
+class StreamHandlerTest(unittest.TestCase):
+    def emit(self, handler: StreamHandler) -> str:
+        logger = logging.getLogger("pyansistring.test")
+        logger.propagate = False
+        logger.addHandler(handler)
+        try:
+            logger.warning("hello %s", "world")
+        finally:
+            logger.removeHandler(handler)
+        return handler.stream.getvalue()
+
+    def test_tty_detection(self):
+        self.assertEqual(self.emit(StreamHandler(io.StringIO())), "WARNING:pyansistring.test:hello world\n")
+        self.assertEqual(
+            self.emit(StreamHandler(TTYStream())),
+            "\x1b[33mWARNING\x1b[0m:pyansistring.test:hello world\n",
+        )
+        self.assertEqual(
+            self.emit(StreamHandler(io.StringIO(), use_color=True)),
+            "\x1b[33mWARNING\x1b[0m:pyansistring.test:hello world\n",
+        )
+        handler = StreamHandler(TTYStream())
+        handler.setStream(io.StringIO())
+        self.assertFalse(handler.colored)
+
+    def test_formatters(self):
+        handler = StreamHandler(TTYStream())
+        handler.setFormatter(Formatter("%(levelname)s %(message)s"))
+        self.assertEqual(self.emit(handler), "\x1b[33mWARNING\x1b[0m hello world\n")
+        # the formatter's own use_color wins over the detection of the handler
+        handler = StreamHandler(TTYStream())
+        handler.setFormatter(Formatter("%(levelname)s %(message)s", use_color=False))
+        self.assertEqual(self.emit(handler), "WARNING hello world\n")
+        handler = StreamHandler(io.StringIO())
+        handler.setFormatter(Formatter("%(levelname)s %(message)s", use_color=True))
+        self.assertEqual(self.emit(handler), "\x1b[33mWARNING\x1b[0m hello world\n")
+        handler = StreamHandler(TTYStream())
+        handler.setFormatter(logging.Formatter("%(levelname)s %(message)s"))
+        self.assertEqual(self.emit(handler), "WARNING hello world\n")
+
+    def test_star_import(self):
+        namespace = {"logging": logging}
+        exec("from pyansistring import *", namespace)
+        self.assertIs(namespace["logging"], logging)
+        self.assertIn("ANSIString", namespace)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+
+from pyansistring.constants import Background, Foreground
+from pyansistring.palette import (COLORS_8B_TO_4B, XTERM_COLORS, color_8b_to_4b,
+                                  downgrade_style, rgb_to_8b)
+
+
+class PaletteTest(unittest.TestCase):
+    def test_rgb_to_8b(self):
+        for index in range(16, 256):
+            self.assertEqual(rgb_to_8b(*XTERM_COLORS[index]), index)
+        self.assertEqual(rgb_to_8b(250, 10, 5), 196)
+        self.assertEqual(rgb_to_8b(130, 128, 126), 244)
+
+    def test_8b_to_4b(self):
+        self.assertEqual(len(COLORS_8B_TO_4B), 256)
+        self.assertEqual(list(COLORS_8B_TO_4B[:16]), list(range(16)))
+        self.assertEqual(color_8b_to_4b(196, Foreground.BLACK), Foreground.BRIGHT_RED)
+        self.assertEqual(color_8b_to_4b(16, Background.BLACK), Background.BLACK)
+        self.assertEqual(color_8b_to_4b(21, Background.BLACK), Background.BLUE)
+
+    def test_downgrade_style(self):
+        style = "\x1b[38;2;255;0;0m\x1b[1m\x1b[48;5;21m\x1b[58;2;0;255;0m\x1b[3;31m"
+        self.assertEqual(downgrade_style(style, 24), style)
+        self.assertEqual(
+            downgrade_style(style, 8),
+            "\x1b[38;5;196m\x1b[1m\x1b[48;5;21m\x1b[58;5;46m\x1b[3;31m",
+        )
+        self.assertEqual(downgrade_style(style, 4), "\x1b[91m\x1b[1m\x1b[44m\x1b[3;31m")
+        self.assertEqual(downgrade_style(style, 0), "\x1b[1m\x1b[3m")
+        self.assertEqual(downgrade_style("\x1b[1;38;2;1;2;3;4m", 4), "\x1b[1;30;4m")
+        self.assertRaises(ValueError, downgrade_style, style, 16)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,24 @@
+import io
+import pickle
+import re
 import sys
+import threading
 import unittest
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from itertools import product
 
-from pyansistring import ANSIString, StyleDict
+from pyansistring import (ANSIString, FrozenANSIString, FrozenStyleDict,
+                          MulticolorProgram, RenderCache, StyleDict,
+                          disable_render_cache, enable_render_cache,
+                          helpers, pyansistring)
 from pyansistring.constants import *
-from pyansistring.helpers import (rsearch_separators, search_separators,
-                                  search_word_spans)
+from pyansistring.helpers import (AHO_CORASICK_THRESHOLD, HUE_STYLES,
+                                  WordMatcher, accumulate, char_width, clamp,
+                                  display_width, fit_width, hsl_to_rgb,
+                                  hsl_to_rgb_many, rsearch_separators,
+                                  search_separators, search_word_spans,
+                                  wrap_spans)
 
 output = []
 
@@ -13,6 +27,64 @@ class OtherFunctionsTest(unittest.TestCase):
         actual = tuple(search_word_spans("Hello, World! Hello, World! He", "Hello"))
         expected = ((0, 5), (14, 19))
         self.assertTupleEqual(actual, expected)
+        actual = tuple(search_word_spans("abcd ABC", "bc", "abc", "b", case_sensitive=False))
+        self.assertTupleEqual(actual, ((0, 3), (5, 8)))
+
+    def test_word_matcher(self):
+        words = [f"E{index:03}" for index in range(AHO_CORASICK_THRESHOLD)] + ["ab", "abc", "bcd", "c"]
+        self.assertIs(WordMatcher.compile(words), WordMatcher.compile(tuple(words)))
+        string = "xabcd E001E0023 Abcd e9999 ab" * 3
+        for case_sensitive in (True, False):
+            matcher = WordMatcher.compile(words, case_sensitive)
+            self.assertIsNone(matcher._pattern)
+            flags = 0 if case_sensitive else re.IGNORECASE
+            expected = tuple(
+                match.span() for match in re.finditer("|".join(map(re.escape, words)), string, flags)
+            )
+            self.assertTupleEqual(tuple(matcher.spans(string)), expected)
+
+    def test_word_matcher_folding(self):
+        words = ["straße", "école", "s", "i"]
+        filler = [f"E{index:03}" for index in range(AHO_CORASICK_THRESHOLD)]
+        string = "ſtraße STRASSE Straße ÉCOLE école İstanbul"
+        expected = ((0, 6), (7, 8), (11, 12), (12, 13), (15, 21), (22, 27), (28, 33), (34, 35), (35, 36))
+        for words in (words, words + filler):
+            self.assertTupleEqual(tuple(WordMatcher(words, case_sensitive=False).spans(string)), expected)
+            self.assertEqual(
+                ANSIString("x ſtop").fm_w(1, "stop", *words, case_sensitive=False).styles.keys(), {2, 3, 4, 5}
+            )
+
+        limit = helpers.MAX_MEMOIZED_TRANSITIONS
+        helpers.MAX_MEMOIZED_TRANSITIONS = 2
+        try:
+            matcher = WordMatcher(filler + ["abcd", "bce"])
+            for _ in range(2):
+                self.assertTupleEqual(tuple(matcher.spans("abce abcx bcd E001")), ((1, 4), (14, 18)))
+            self.assertEqual(matcher._memoized, 2)
+        finally:
+            helpers.MAX_MEMOIZED_TRANSITIONS = limit
+
+    def test_display_width(self):
+        self.assertEqual(tuple(map(char_width, "a\t\u0301\u200b日！😀")), (1, 0, 0, 0, 2, 2, 2))
+        self.assertEqual(display_width("Hello"), 5)
+        self.assertEqual(display_width("e\u0301té 日本"), 8)
+        self.assertEqual(display_width("😀 ok"), 5)
+        self.assertEqual(fit_width("日本語", 5), 2)
+        self.assertEqual(fit_width("e\u0301x", 1), 2)
+        self.assertEqual(fit_width("abc", 5), 3)
+
+    def test_wrap_spans(self):
+        string = "  The quick brown fox\n\njumps over   the lazy dog"
+        lines = [string[start:stop] for start, stop in wrap_spans(string, 10)]
+        self.assertEqual(lines, ["  The", "quick", "brown fox", "", "jumps over", "the lazy", "dog"])
+        string = string.replace("o", "ö")
+        lines = [string[start:stop] for start, stop in wrap_spans(string, 10)]
+        self.assertEqual(lines, ["  The", "quick", "bröwn föx", "", "jumps över", "the lazy", "dög"])
+        self.assertEqual(wrap_spans("abcdefg hi", 3), [(0, 3), (3, 6), (6, 7), (8, 10)])
+        self.assertEqual(wrap_spans("日本語のテキスト", 5), [(0, 2), (2, 4), (4, 6), (6, 8)])
+        self.assertEqual(wrap_spans("", 5), [])
+        with self.assertRaises(ValueError):
+            wrap_spans("text", 0)
 
     def test_search_separators(self):
         actual = tuple(search_separators("Hello, World!", WHITESPACE.union(PUNCTUATION)))
@@ -24,6 +96,21 @@ class OtherFunctionsTest(unittest.TestCase):
         expected = ("!", " ,")
         self.assertTupleEqual(actual, expected)
 
+    def test_hsl_to_rgb_many(self):
+        hues = [round(index / 1000 * 360) for index in range(1000)] + [0.5, 359.9]
+        actual = tuple(zip(*hsl_to_rgb_many(hues)))
+        expected = tuple(hsl_to_rgb(hue) for hue in hues)
+        self.assertTupleEqual(actual, expected)
+
+    def test_accumulate(self):
+        for value, step, lo, hi in ((300, -255 / 7, 0, 255), (0, 0.1, 0, float("inf"))):
+            actual = [float(value) for value in accumulate(value, step, 1000, lo, hi)]
+            expected = []
+            for _ in range(1000):
+                value = clamp(value + step, lo, hi)
+                expected.append(value)
+            self.assertListEqual(actual, expected)
+
 class BaseTestCase:
     def get_function_name(self, depth: int = 0) -> str:
         return sys._getframe(depth).f_code.co_name
@@ -178,6 +265,34 @@ class ANSIStringFeatureTest(BaseTestCase, unittest.TestCase):
         for a, e in zip(actual, expected):
             self.extended_assert_equal(a, e)
 
+    def test_re(self):
+        bold, blue, res = f"\x1b[1m", f"\x1b[38;2;0;0;255m", f"\x1b[0m"
+        on_gray = f"\x1b[48;5;240m"
+        actual = (
+            ANSIString("id=42, ip=10.0.0.1").fg_24b_re(0, 0, 255, r"\d+"),
+            ANSIString("id=42, IP=10.0.0.1").fm_re(SGR.BOLD, re.compile(r"(ip)=", re.I), group=1),
+            ANSIString("id=42, ip=10.0.0.1").fm_re(SGR.BOLD, "id|ip").unfm_re("I", re.I),
+            ANSIString("id=42, ip=10.0.0.1").fm_re(SGR.BOLD, "nothing"),
+            ANSIString("id=42, ip=10.0.0.1").fm_re_groups(
+                r"(?P<key>\w+)=(?P<value>[\d.]+)", {"key": SGR.BOLD, "value": "48;5;240", 0: SGR.BOLD},
+            ),
+        )
+        expected = (
+            "id=" + "".join(f"{blue}{char}{res}" for char in "42") + ", ip=" +
+            "".join(f"{blue}{char}{res}" if char != "." else char for char in "10.0.0.1"),
+            "id=42, " + "".join(f"{bold}{char}{res}" for char in "IP") + "=10.0.0.1",
+            f"i{bold}d{res}=42, i{bold}p{res}=10.0.0.1",
+            "id=42, ip=10.0.0.1",
+            ", ".join(
+                "".join(f"{bold}{bold}{char}{res}" for char in key) + f"{bold}={res}" +
+                "".join(f"{on_gray}{bold}{char}{res}" for char in value)
+                for key, value in (("id", "42"), ("ip", "10.0.0.1"))
+            ),
+        )
+        for a, e in zip(actual, expected):
+            self.extended_assert_equal(a, e)
+        self.assertRaises(ValueError, ANSIString("id").fm_re, SGR.BOLD, re.compile("id"), re.I)
+
     def test_bg_4b(self):
         bright_blue, bright_yellow, res = f"\x1b[104m", f"\x1b[103m", f"\x1b[0m"
         actual = (
@@ -302,6 +417,13 @@ class ANSIStringFeatureTest(BaseTestCase, unittest.TestCase):
         )
         for a, e in zip(actual, expected):
             self.extended_assert_equal(a, e)
+        self.assertDictEqual(
+            ANSIString("ab").rainbow(ul=True).styles,
+            {0: "\x1b[58;2;255;0;0m", 1: "\x1b[58;2;0;255;255m"},
+        )
+        shifted = ANSIString("abcdefghijklmnopqrstuvwxyz").rainbow(offset=180)
+        self.assertEqual(shifted.styles[0], HUE_STYLES[180].fg)
+        self.assertEqual(shifted.styles[13], HUE_STYLES[0].fg)
 
     def test_multicolor(self):
         string = "abcdefghijklmnopqrstuvwxyz"
@@ -395,6 +517,43 @@ class ANSIStringFeatureTest(BaseTestCase, unittest.TestCase):
             {key: value for key, value in enumerate(reversed(actual[3].styles.values()))}
         )
     
+    def test_multicolor_program(self):
+        program = MulticolorProgram.compile(MulticolorSequences.RAINBOW)
+        self.assertIs(program, MulticolorProgram.compile(MulticolorSequences.RAINBOW))
+        for string in ("abcdefghijklmnopqrstuvwxyz", "Hello, World!"):
+            actual = program.apply(ANSIString(string))
+            expected = ANSIString(string).multicolor(MulticolorSequences.RAINBOW)
+            self.extended_assert_equal(actual, expected.styled, verbose=False)
+        actual = ANSIString("abcdef").multicolor("r=0:|g=0:|b=0: $ r+10:repeat(2) # b+5:repeat(auto) &*")
+        expected = ANSIString("abcdef", StyleDict({
+            0: '\x1b[38;2;0;0;0m', 1: '\x1b[38;2;10;0;0m', 2: '\x1b[38;2;20;0;0m',
+            3: '\x1b[38;2;20;0;5m', 4: '\x1b[38;2;20;0;10m', 5: '\x1b[38;2;20;0;15m'}))
+        self.extended_assert_equal(actual, expected)
+        trajectory = program.trajectory(26)
+        self.assertEqual(len(trajectory), 26)
+        self.assertTupleEqual(trajectory[0], ((255, 0, 0), None))
+        self.assertTupleEqual(trajectory[5], ((255, 255, 0), None))
+        # commands without repeat() run once and leave the slices to "auto"
+        program = MulticolorProgram.compile("r=0: # r+10:repeat(auto)")
+        self.assertTupleEqual(program.resolve_repeats(4), (1, 4))
+
+    def test_multicolor_seed(self):
+        from random import Random
+        sequence = "r=40:|g=189:|b=38: $ r+random(-40,0):|g+random(-50,50):? &"
+        actual = (
+            ANSIString("abcdefghijklmnopqrstuvwxyz").multicolor(sequence, seed=7),
+            ANSIString("abcdefghijklmnopqrstuvwxyz").multicolor(sequence, seed=Random(7)),
+            ANSIString("Hello, \nWorld!").multicolor_c(sequence, seed=7),
+        )
+        expected = (
+            ANSIString("abcdefghijklmnopqrstuvwxyz").multicolor(sequence, seed=7),
+            ANSIString("abcdefghijklmnopqrstuvwxyz").multicolor(sequence, seed=7),
+            ANSIString("Hello, \nWorld!").multicolor_c(sequence, seed=7),
+        )
+        for a, e in zip(actual, expected):
+            self.extended_assert_equal(a, e, verbose=False)
+        self.assertGreater(len(set(actual[0].styles.values())), 1)
+
     def test_multicolor_c(self):
         actual = ANSIString("Hello, \nWorld!\n It's pyansistring!").multicolor_c(MulticolorSequences.RAINBOW).styles.values()
         expected = ANSIString("Hello, World! It's pyansistring!").multicolor(MulticolorSequences.RAINBOW).styles.values()
@@ -402,6 +561,116 @@ class ANSIStringFeatureTest(BaseTestCase, unittest.TestCase):
             self.assertEqual(a, e)
         
 
+    def test_coords_to_slices(self):
+        string = ANSIString("ab\r\ncd\n\nef")
+        self.assertTupleEqual(
+            string.coords_to_slices((1, 0), ((0, 1), (1, 1)), (0, 3)),
+            (slice(1, 2), (slice(4, 5), slice(5, 6)), slice(8, 9)),
+        )
+        self.assertListEqual(
+            list(string.iter_coords()),
+            [(0, 0), (1, 0), (0, 1), (1, 1), (0, 3), (1, 3)],
+        )
+        for coord in ((0, 2), (2, 0), (0, 4)):
+            with self.assertRaises(IndexError):
+                string.coords_to_slices(coord)
+        self.assertDictEqual(
+            string.multicolor_c("r=255: &", (1, 3)).styles,
+            {9: "\x1b[38;2;255;0;0m"},
+        )
+
+    def test_render_color_depth(self):
+        string = ANSIString("ab").fg_24b(255, 0, 0, (0, 1)).fm(SGR.BOLD).bg_8b(21, (1, 2))
+        self.assertEqual(string.render(), string.styled)
+        self.assertEqual(string.render(8), "\x1b[38;5;196m\x1b[1ma\x1b[0m\x1b[1m\x1b[48;5;21mb\x1b[0m")
+        self.assertEqual(string.render(4), "\x1b[91m\x1b[1ma\x1b[0m\x1b[1m\x1b[44mb\x1b[0m")
+        self.assertEqual(string.render(0), "\x1b[1ma\x1b[0m\x1b[1mb\x1b[0m")
+        self.assertEqual(ANSIString("ab").fg_8b(21).render(0), "ab")
+        self.assertEqual("".join(string.iter_render(1, color_depth=4)), string.render(4))
+        self.assertRaises(ValueError, string.render, 16)
+
+    def test_render_bytes(self):
+        strings = (
+            ANSIString("héllo wörld " * 20).fm(SGR.BOLD, (0, 1000, 3)).fg_24b(1, 2, 3, (0, 50)),
+            ANSIString("héllo wörld " * 20).fm(SGR.BOLD, (5, 200)),
+            ANSIString("plain"),
+            ANSIString("plain héllo " * 3),
+        )
+        chunk_size = pyansistring._ENCODE_CHUNK_SIZE
+        try:
+            for pyansistring._ENCODE_CHUNK_SIZE, string in product((chunk_size, 7), strings):
+                for encoding, color_depth in (("utf-8", 24), ("utf-16-le", 24), ("latin-1", 4)):
+                    expected = string.render(color_depth).encode(encoding)
+                    self.assertEqual(string.render_bytes(encoding, color_depth), expected)
+                    buffer = bytearray(b"xx")
+                    self.assertEqual(string.render_into(buffer, 1, encoding, color_depth), len(expected))
+                    self.assertEqual(buffer, b"x" + expected)
+        finally:
+            pyansistring._ENCODE_CHUNK_SIZE = chunk_size
+        expected = strings[0].render_bytes()
+        view = memoryview(bytearray(len(expected) + 1))
+        self.assertEqual(strings[0].render_into(view, 1), len(expected))
+        self.assertEqual(view[1:].tobytes(), expected)
+        with self.assertRaisesRegex(ValueError, f"{len(expected)} bytes needed, {len(expected) - 1} available"):
+            strings[0].render_into(view, 2)
+
+    def test_iter_render(self):
+        string = ANSIString("Hello, World!" * 5).fm(SGR.BOLD, (0, 5), (40, 50)).fg_8b(135, (45, 46))
+        for chunk_size in (1, 7, 13, 64, 1000):
+            chunks = list(string.iter_render(chunk_size))
+            self.assertEqual(len(chunks), -(-len(string) // chunk_size))
+            self.assertEqual("".join(chunks), string.styled)
+        self.assertEqual(list(ANSIString("").iter_render()), [])
+        self.assertRaises(ValueError, next, string.iter_render(0))
+        text, binary = io.StringIO(), io.BytesIO()
+        self.assertEqual(string.write_to(text, chunk_size=10), string.actual_length)
+        self.assertEqual(text.getvalue(), string.styled)
+        self.assertEqual(string.write_to(binary), len(string.styled.encode()))
+        self.assertEqual(binary.getvalue(), string.styled.encode())
+
+    def test_render_many(self):
+        lines = [f"{index} ERROR: request {index} failed" for index in range(300)]
+        operations = [("fg_24b_w", (255, 0, 0, "ERROR")), ("rainbow", ((0, 3),)), ("fm", (SGR.BOLD,))]
+        expected = [
+            ANSIString(line).fg_24b_w(255, 0, 0, "ERROR").rainbow((0, 3)).fm(SGR.BOLD).styled
+            for line in lines
+        ]
+        self.assertListEqual(ANSIString.render_many(lines, operations), expected)
+        threshold = pyansistring.PARALLEL_THRESHOLD
+        pyansistring.PARALLEL_THRESHOLD = 0
+        try:
+            for executor in ("process", "thread"):
+                actual = ANSIString.render_many(
+                    iter(lines), operations, workers=2, executor=executor, chunk_size=64
+                )
+                self.assertListEqual(actual, expected)
+        finally:
+            pyansistring.PARALLEL_THRESHOLD = threshold
+        for operations in (["_render"], ["upper"], [("ljust", (20,))], ["split"], ["freeze"], ["missing"], [(1,)]):
+            self.assertRaises(ValueError, ANSIString.render_many, lines, operations)
+        self.assertRaises(ValueError, ANSIString.render_many, lines, [], executor="fork")
+
+
+    def test_render_parallel(self):
+        string = ANSIString("INFO request done\n" * 200).fg_4b(Foreground.CYAN, slice(0, 3600, 3))
+        string.fm(SGR.BOLD, slice(100, 2000))
+        expected = {depth: string.render(depth) for depth in (24, 4)}
+        threshold = pyansistring.PARALLEL_RENDER_THRESHOLD
+        pyansistring.PARALLEL_RENDER_THRESHOLD = 0
+        try:
+            with ThreadPoolExecutor(2) as pool:
+                for executor in ("process", "thread", pool):
+                    for depth in (24, 4):
+                        actual = string.render(depth, parallel=True, workers=2, executor=executor)
+                        self.assertEqual(actual, expected[depth])
+        finally:
+            pyansistring.PARALLEL_RENDER_THRESHOLD = threshold
+        bounds = string._run_bounds(dict(string.styles), 8)
+        self.assertEqual((bounds[0], bounds[-1]), (0, len(string)))
+        self.assertTrue(all(string.styles.get(bound - 1) != string.styles.get(bound) for bound in bounds[1:-1]))
+        self.assertRaises(ValueError, string.render, parallel=True, executor="fork")
+
+
 class ANSIStringDefaultTest(BaseTestCase, unittest.TestCase):
     def test___getitem__(self):
         bold, italic, res = f"\x1b[1m", f"\x1b[3m", f"\x1b[0m"
@@ -431,6 +700,25 @@ class ANSIStringDefaultTest(BaseTestCase, unittest.TestCase):
         expected = "Hello" + "".join(f"{bold}{char}{res}" for char in ", World!")
         self.extended_assert_equal(actual, expected)
 
+    def test___format__(self):
+        bold, res = "\x1b[1m", "\x1b[0m"
+        string = ANSIString("日本").fm(SGR.BOLD)
+        self.assertEqual(format(string, "6"), f"{bold}日{res}{bold}本{res}  ")
+        self.assertEqual(format(string, "*>6"), f"**{bold}日{res}{bold}本{res}")
+        self.assertEqual(format(string, "^6"), f" {bold}日{res}{bold}本{res} ")
+        self.assertEqual(format(string, "<4.3"), f"{bold}日{res}  ")
+        self.assertEqual(format(string, ""), string.styled)
+        for spec in ("05", "<06", ">05", "*>05", "0", "06.1"):
+            self.assertEqual(ANSIString.from_ansi(format(ANSIString("ab").fm(SGR.BOLD), spec)).plain, format("ab", spec))
+        self.assertEqual(format(string, "06"), f"{bold}日{res}{bold}本{res}00")
+
+    def test_alignment_display_width(self):
+        string = ANSIString("日本e\u0301")
+        self.assertEqual(string.display_width, 5)
+        self.assertEqual(string.ljust(8).plain, "日本e\u0301   ")
+        self.assertEqual(string.rjust(6, "-").plain, "-日本e\u0301")
+        self.assertEqual(string.center(9).plain, "  日本e\u0301  ")
+
     def test_capitalize(self):
         bold, res = f"\x1b[1m", f"\x1b[0m"
         actual = ANSIString("hello, world!").fm(SGR.BOLD).capitalize()
@@ -460,6 +748,12 @@ class ANSIStringDefaultTest(BaseTestCase, unittest.TestCase):
         self.assertEqual(string.endswith("!"), True)
         self.assertEqual(string.endswith("[0m"), False)
 
+    def test_fill(self):
+        bold, res = "\x1b[1m", "\x1b[0m"
+        string = ANSIString("Hello brave new world").fm(SGR.BOLD, slice(4, 7))
+        self.assertEqual(string.fill(10), f"Hell{bold}o{res}\n{bold}b{res}rave new\nworld")
+        self.assertEqual(string.fill(), string)
+
     def test_find(self):
         actual = (
             ANSIString(" Hello, World!").fm(SGR.BOLD).find(" "),
@@ -706,6 +1000,16 @@ class ANSIStringDefaultTest(BaseTestCase, unittest.TestCase):
                     comment=f"(keeptrue={False if not step else True})",
                 )
     
+    def test_shorten(self):
+        bold, res = "\x1b[1m", "\x1b[0m"
+        string = ANSIString("Hello  brave new\tworld").fm(SGR.BOLD, slice(5, 8))
+        self.assertEqual(string.shorten(30), f"Hello {bold}b{res}rave new world")
+        self.assertEqual(string.shorten(17), f"Hello {bold}b{res}rave [...]")
+        self.assertEqual(string.shorten(12, "…"), f"Hello {bold}b{res}rave…")
+        self.assertEqual(string.shorten(8), "[...]")
+        with self.assertRaises(ValueError):
+            string.shorten(3)
+
     def test_startswith(self):
         string = ANSIString("Hello, World!").fm(SGR.BOLD)
         self.assertEqual(string.startswith("H"), True)
@@ -723,6 +1027,24 @@ class ANSIStringDefaultTest(BaseTestCase, unittest.TestCase):
         expected = "".join(f"{bold}{char}{res}" for char in "Hello, World!")
         self.extended_assert_equal(actual, expected)
 
+    def test_truncate(self):
+        bold, res = "\x1b[1m", "\x1b[0m"
+        string = ANSIString("日本語 text").fm(SGR.BOLD, slice(0, 1))
+        self.assertEqual(string.truncate(20), string)
+        self.assertEqual(string.truncate(4), f"{bold}日{res}…")
+        self.assertEqual(string.truncate(5, "..."), f"{bold}日{res}...")
+        self.assertEqual(string.truncate(2, "..."), "..")
+        self.assertEqual(string.truncate(5, "").display_width, 4)
+
+    def test_wrap(self):
+        bold, res = "\x1b[1m", "\x1b[0m"
+        string = ANSIString("Hello brave new world").fm(SGR.BOLD, slice(4, 7))
+        self.assertEqual(string.wrap(10), [f"Hell{bold}o{res}", f"{bold}b{res}rave new", "world"])
+        self.assertEqual(
+            [line.styles for line in string.wrap(10)],
+            [{4: bold}, {0: bold}, {}],
+        )
+
     def test_upper(self):
         bold, res = f"\x1b[1m", f"\x1b[0m"
         actual = ANSIString("Hello, World!").fm(SGR.BOLD).upper()
@@ -730,6 +1052,214 @@ class ANSIStringDefaultTest(BaseTestCase, unittest.TestCase):
         self.extended_assert_equal(actual, expected)
 
 
+class StyleVersionTest(unittest.TestCase):
+    def test_versions(self):
+        styles = StyleDict({0: "\x1b[1m"})
+        self.assertFalse(styles.has_been_modified)
+        for modify in (
+            lambda: styles.update({0: "\x1b[2m"}),  # same length, new value
+            lambda: styles.setdefault(1, "\x1b[1m"),
+            lambda: styles.__setitem__(2, "\x1b[3m"),
+            lambda: styles.pop(2),
+            lambda: styles.__ior__({3: "\x1b[4m"}),
+            lambda: styles.__delitem__(3),
+            lambda: styles.popitem(),
+            lambda: styles.clear(),
+        ):
+            version = styles.version
+            modify()
+            self.assertGreater(styles.version, version)
+            self.assertTrue(styles.has_been_modified)
+            self.assertFalse(styles.has_been_modified)
+
+        # strings sharing a style dictionary both see its modifications
+        string = ANSIString("ab").fm(SGR.BOLD)
+        upper = string.upper()
+        self.assertIs(upper.styles, string.styles)
+        self.assertEqual((string.styled, upper.styled), ("\x1b[1ma\x1b[0m\x1b[1mb\x1b[0m", "\x1b[1mA\x1b[0m\x1b[1mB\x1b[0m"))
+        string.styles.update({0: "\x1b[2m", 1: "\x1b[2m"})
+        self.assertEqual((string.styled, upper.styled), ("\x1b[2ma\x1b[0m\x1b[2mb\x1b[0m", "\x1b[2mA\x1b[0m\x1b[2mB\x1b[0m"))
+
+    def test_render_lock_stripes(self):
+        strings = [ANSIString(f"string {index}") for index in range(2000)]
+        stripes = Counter(map(id, map(pyansistring._render_lock, strings)))
+        self.assertEqual(len(stripes), len(pyansistring._RENDER_LOCKS))
+        self.assertLess(max(stripes.values()), 4 * len(strings) // len(pyansistring._RENDER_LOCKS))
+
+    def test_concurrent_readers(self):
+        renders = []
+
+        class CountingANSIString(ANSIString):
+            def _render(self, styles=None):
+                renders.append(None)
+                return super()._render(styles)
+
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            # a cold cache read by many threads at once is rendered once
+            string = CountingANSIString("x" * 20000).fm(SGR.BOLD)
+            barrier = threading.Barrier(16)
+
+            def read() -> None:
+                barrier.wait()
+                string.styled
+
+            threads = [threading.Thread(target=read) for _ in range(16)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(len(renders), 1)
+
+            # readers see whole renders, never older than the last completed write
+            string = ANSIString("abcdefgh" * 16)
+            renders = {  # render with the first `count` chars bold -> count
+                ANSIString(string.plain).fm(SGR.BOLD, slice(0, count)).styled: count
+                for count in range(len(string) + 1)
+            }
+            completed, errors, done = [0], [], threading.Event()
+
+            def reader() -> None:
+                while not done.is_set():
+                    minimum = completed[0]
+                    if renders.get(string.styled, -1) < minimum:
+                        errors.append(minimum)
+
+            def writer() -> None:
+                for index in range(len(string)):
+                    string.fm(SGR.BOLD, slice(index, index + 1))
+                    completed[0] = index + 1
+                done.set()
+
+            threads = [threading.Thread(target=reader) for _ in range(8)] + [threading.Thread(target=writer)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(errors, [])
+            self.assertEqual(renders[string.styled], len(string))
+        finally:
+            sys.setswitchinterval(switch_interval)
+
+
+class FrozenANSIStringTest(unittest.TestCase):
+    def test_freeze(self):
+        string = ANSIString("hello world").fm(SGR.BOLD, slice(0, 5))
+        frozen = string.freeze()
+        self.assertIsInstance(frozen.styles, FrozenStyleDict)
+        self.assertEqual(frozen.style_runs, ((0, 5, "\x1b[1m"),))
+        self.assertIs(frozen.freeze(), frozen)
+        string.fm(SGR.ITALIC)  # frozen copies do not follow their source
+        self.assertEqual(frozen.styles, {index: "\x1b[1m" for index in range(5)})
+
+        thawed = frozen.thaw()
+        self.assertIs(type(thawed), ANSIString)
+        thawed.fg_4b(Foreground.RED)
+        self.assertEqual(len(frozen.styles), 5)
+        self.assertEqual(frozen, frozen.thaw())
+        self.assertNotEqual(frozen, frozen.styled)
+
+    def test_hash(self):
+        frozen = ANSIString("hello world").fm(SGR.BOLD, slice(0, 5)).freeze()
+        same = FrozenANSIString("hello world", {index: "\x1b[1m" for index in range(5)})
+        self.assertEqual(hash(frozen), hash(same))
+        self.assertIsNone(same._styled)  # hashing does not render
+        self.assertEqual({frozen: 1}[same], 1)
+        self.assertEqual(len({frozen, same, same.thaw().fm(SGR.DIM, slice(0, 1)).freeze()}), 2)
+        self.assertNotEqual(frozen, FrozenANSIString("hello world"))
+        unstyled = FrozenANSIString("hello world")
+        self.assertEqual(unstyled, "hello world")
+        self.assertEqual(hash(unstyled), hash("hello world"))
+        self.assertIn("hello world", {unstyled})
+        self.assertEqual({"hello world": 1}.get(unstyled), 1)
+        self.assertNotIn(frozen, {"hello world", frozen.styled})
+        self.assertRaises(TypeError, hash, frozen.thaw())
+        self.assertEqual(pickle.loads(pickle.dumps(frozen)), frozen)
+
+    def test_immutable(self):
+        frozen = ANSIString("hello world").fm(SGR.BOLD, slice(0, 5)).freeze()
+        rendered = frozen.styled
+        for modify in (
+            lambda: frozen.fm(SGR.DIM),
+            lambda: frozen.fg_24b_w(255, 0, 0, "hello"),
+            lambda: frozen.unfm_re("h"),
+            lambda: frozen.rainbow(),
+            lambda: frozen.styles.update({0: "\x1b[2m"}),
+            lambda: frozen.styles.__setitem__(0, "\x1b[2m"),
+            lambda: frozen.styles.pop(0),
+        ):
+            self.assertRaises(TypeError, modify)
+        self.assertIs(frozen.styled, rendered)
+        # methods returning new strings return frozen ones
+        for derived in (frozen.upper(), frozen[1:4], frozen + "!", frozen.ljust(20), *frozen.wrap(5)):
+            self.assertIsInstance(derived, FrozenANSIString)
+        self.assertEqual(ANSIString(">") + frozen, ANSIString(">hello world").fm(SGR.BOLD, slice(1, 6)))
+
+
+class PicklingTest(unittest.TestCase):
+    def test_pickle(self):
+        string = ANSIString("hello").fm(SGR.BOLD, slice(0, 2))
+        string.styled
+        loaded = pickle.loads(pickle.dumps(string))
+        self.assertIsNone(loaded._styled)
+        self.assertEqual(loaded, string)
+        loaded.fm(SGR.DIM)
+        self.assertEqual(loaded.styles[4], "\x1b[2m")
+
+
+class RenderCacheTest(unittest.TestCase):
+    def tearDown(self):
+        disable_render_cache()
+
+    def test_shared_renders(self):
+        cache = enable_render_cache(maxsize=2, max_length=10)
+        badge = lambda: ANSIString(" OK ").fg_4b(Foreground.GREEN).fm(SGR.BOLD, slice(1, 3))
+        first, second = badge(), badge()
+        self.assertIs(first.styled, second.styled)
+        # the fingerprint does not depend on the order of the styles
+        reordered = ANSIString(" OK ", dict(reversed(first.styles.items())))
+        self.assertIs(reordered.styled, first.styled)
+        self.assertIs(badge().freeze().styled, first.styled)
+        self.assertEqual(cache.info()[:4], (3, 1, 0, 1))
+        self.assertAlmostEqual(cache.info().hit_ratio, 0.75)
+
+        # modified strings are rendered from their new styles
+        second.unfm(slice(0, 2))
+        self.assertEqual(second.styled, ANSIString(" OK ").fg_4b(Foreground.GREEN, slice(2, 4)).fm(SGR.BOLD, slice(2, 3)).styled)
+        self.assertEqual(first.styled, badge()._render())
+
+        # least recently used renders are evicted; long strings are not cached
+        ANSIString("other").fm(SGR.DIM).styled
+        badge().styled
+        ANSIString("third").fm(SGR.DIM).styled
+        self.assertEqual(cache.info().evictions, 3)
+        self.assertEqual(len(cache), 2)
+        ANSIString("a" * 11).fm(SGR.DIM).styled
+        self.assertEqual(len(cache), 2)
+        cache.clear()
+        self.assertEqual(cache.info(), (0, 0, 0, 0, 2))
+        self.assertRaises(ValueError, RenderCache, 0)
+
+    def test_subclasses(self):
+        class UpperANSIString(ANSIString):
+            def _render(self, styles=None):
+                return super()._render(styles).upper()
+
+        cache = enable_render_cache()
+        string = ANSIString("ok").fm(SGR.BOLD)
+        self.assertEqual(string.styled, "\x1b[1mo\x1b[0m\x1b[1mk\x1b[0m")
+        self.assertEqual(UpperANSIString("ok").fm(SGR.BOLD).styled, "\x1b[1MO\x1b[0M\x1b[1MK\x1b[0M")
+        self.assertIs(string.freeze().styled, string.styled)
+        self.assertEqual(cache.info()[:2], (1, 2))
+
+    def test_disabled(self):
+        cache = enable_render_cache()
+        disable_render_cache()
+        ANSIString("text").fm(SGR.BOLD).styled
+        self.assertEqual(cache.info().misses, 0)
+
+
 if __name__ == "__main__":
 
     unittest.main(argv=['first-arg-is-ignored'], verbosity=2, exit=False)
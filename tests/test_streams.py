@@ -0,0 +1,158 @@
+import asyncio
+import io
+import threading
+import unittest
+
+from pyansistring import ANSICanvas, ANSIString, ANSIWriter, AsyncANSIWriter, write_async
+from pyansistring.constants import SGR
+
+BOLD, ITALIC, RES = "\x1b[1m", "\x1b[3m", "\x1b[0m"
+
+
+class StringIO(io.StringIO):
+    def __init__(self) -> None:
+        super().__init__()
+        self.flushed = threading.Event()
+
+    def flush(self) -> None:
+        super().flush()
+        self.flushed.set()
+
+
+class ANSIWriterTest(unittest.TestCase):
+    def test_compact(self):
+        fp = io.StringIO()
+        with ANSIWriter(fp) as writer:
+            writer.write(ANSIString("ab cd\n").fm(SGR.BOLD, (0, 2), (3, 5)))
+            writer.write(ANSIString("ef gh\n").fm(SGR.BOLD, (0, 2)).fm(SGR.ITALIC, (3, 5)))
+            writer.write("plain ")
+            writer.write(ANSIString("x").fm(SGR.BOLD))
+            self.assertEqual((fp.getvalue(), writer.flushes), ("", 0))
+        self.assertEqual(
+            fp.getvalue(),
+            f"{BOLD}ab{RES} {BOLD}cd\nef{RES} {ITALIC}gh{RES}\nplain {BOLD}x{RES}",
+        )
+        self.assertEqual((writer.flushes, writer.bytes_written), (1, len(fp.getvalue())))
+
+    def test_not_compact(self):
+        fp = io.BytesIO()
+        strings = [ANSIString("ab\n").fm(SGR.BOLD, (0, 1)), "é\n", ANSICanvas(1, 1).set(0, 0, ITALIC)]
+        with ANSIWriter(fp, compact=False) as writer:
+            writer.writelines(strings)
+        expected = f"{BOLD}a{RES}b\né\n{ITALIC} {RES}".encode()
+        self.assertEqual(fp.getvalue(), expected)
+        self.assertEqual(writer.bytes_written, len(expected))
+
+    def test_flush_policy(self):
+        fp = io.StringIO()
+        writer = ANSIWriter(fp, buffer_size=10)
+        writer.write("12345")
+        self.assertEqual(writer.flushes, 0)
+        writer.write(ANSIString("678").fm(SGR.BOLD))
+        self.assertEqual((writer.flushes, fp.getvalue()), (1, f"12345{BOLD}678{RES}"))
+        writer = ANSIWriter(fp, line_buffered=True)
+        writer.write("a")
+        writer.write("b\nc")
+        self.assertEqual(writer.flushes, 1)
+        writer = ANSIWriter(fp, flush_interval=0)
+        writer.write("d")
+        self.assertEqual(writer.flushes, 1)
+        writer.flush()
+        self.assertEqual(writer.flushes, 1)
+
+    def test_timed_flush(self):
+        fp = StringIO()
+        with ANSIWriter(fp, flush_interval=0.05) as writer:
+            writer.write(ANSIString("ab").fm(SGR.BOLD))
+            writer.write("c")
+            self.assertEqual(writer.flushes, 0)
+            self.assertTrue(fp.flushed.wait(10))
+            writer.flush()  # nothing left to write, returns once the timed flush is done
+            self.assertEqual((writer.flushes, fp.getvalue()), (1, f"{BOLD}ab{RES}c"))
+            writer.write("d")
+        self.assertEqual((writer.flushes, fp.getvalue()), (2, f"{BOLD}ab{RES}cd"))
+
+
+class StreamWriter:
+    def __init__(self) -> None:
+        self.data, self.drains = bytearray(), 0
+        self.drained = asyncio.Event()
+
+    def write(self, data: bytes) -> None:
+        self.data += data
+
+    async def drain(self) -> None:
+        self.drains += 1
+        self.drained.set()
+
+
+class AsyncANSIWriterTest(unittest.TestCase):
+    def test_write_async(self):
+        string = ANSIString("héllo " * 1000).fm(SGR.BOLD, (0, 6000, 7))
+
+        async def main(**kwargs):
+            stream, ticks = StreamWriter(), 0
+
+            async def tick():
+                nonlocal ticks
+                while True:
+                    ticks += 1
+                    await asyncio.sleep(0)
+
+            ticker = asyncio.create_task(tick())
+            await asyncio.sleep(0)
+            written = await write_async(stream, string, chunk_size=500, **kwargs)
+            ticker.cancel()
+            return stream, written, ticks
+
+        for kwargs in ({}, {"offload_threshold": 1000}):
+            stream, written, ticks = asyncio.run(main(**kwargs))
+            self.assertEqual(bytes(stream.data), string.styled.encode())
+            self.assertEqual((written, stream.drains), (len(stream.data), 12))
+            self.assertGreaterEqual(ticks, 12)
+        stream, written, _ = asyncio.run(main(color_depth=0))
+        self.assertEqual(bytes(stream.data), string.render(0).encode())
+
+    def test_writer(self):
+        async def main():
+            stream = StreamWriter()
+            async with AsyncANSIWriter(stream, buffer_size=100, color_depth=8) as writer:
+                await writer.write(ANSIString("ab\n").fg_24b(255, 0, 0, (0, 1)))
+                await writer.writelines(["c" * 60, ANSIString("d" * 150).fm(SGR.BOLD, (0, 1))])
+                self.assertEqual(writer.flushes, 2)
+            return stream, writer
+
+        stream, writer = asyncio.run(main())
+        self.assertEqual(
+            stream.data.decode(),
+            f"\x1b[38;5;196ma{RES}b\n" + "c" * 60 + f"{BOLD}d{RES}" + "d" * 149,
+        )
+        self.assertEqual((writer.flushes, writer.bytes_written, stream.drains), (2, len(stream.data), 3))
+
+    def test_concurrent_tasks(self):
+        async def main():
+            stream = StreamWriter()
+            async with AsyncANSIWriter(stream, buffer_size=10, line_buffered=True) as writer:
+                await asyncio.gather(writer.write("A" * 100), writer.write("b\n"), writer.flush())
+            return stream
+
+        self.assertEqual(bytes(asyncio.run(main()).data), b"A" * 100 + b"b\n")
+
+    def test_timed_flush(self):
+        async def main():
+            stream = StreamWriter()
+            async with AsyncANSIWriter(stream, flush_interval=0.05) as writer:
+                await writer.write(ANSIString("ab").fm(SGR.BOLD))
+                await writer.write("c")
+                self.assertEqual(writer.flushes, 0)
+                await asyncio.wait_for(stream.drained.wait(), 10)
+                self.assertEqual((writer.flushes, bytes(stream.data)), (1, f"{BOLD}ab{RES}c".encode()))
+                await writer.write("d")
+            return stream, writer
+
+        stream, writer = asyncio.run(main())
+        self.assertEqual((writer.flushes, bytes(stream.data)), (2, f"{BOLD}ab{RES}cd".encode()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+
+from pyansistring import ANSIString, StyledTemplate
+from pyansistring.constants import SGR, Foreground
+
+
+class StyledTemplateTest(unittest.TestCase):
+    def test_render(self):
+        template = StyledTemplate(
+            ANSIString("[{done:>2}/{total}] {name}{{}}").fm(SGR.DIM, slice(0, 2)),
+            field_styles={"name": (SGR.BOLD, Foreground.GREEN)},
+        )
+        self.assertEqual(
+            template.render(done=5, total=10, name="build"),
+            "\x1b[2m[\x1b[0m\x1b[2m 5\x1b[0m/10] \x1b[1m\x1b[32mbuild\x1b[0m{}",
+        )
+        self.assertEqual(template.render_map({"done": 1, "total": 2, "name": ""}), "\x1b[2m[\x1b[0m\x1b[2m 1\x1b[0m/2] {}")
+        self.assertEqual(StyledTemplate("{} {!r} {.real}").render("a", "b", 3), "a 'b' 3")
+        self.assertEqual(StyledTemplate("{0[1]} {x}").render("ab", x=ANSIString("y").fm(SGR.BOLD)), "b \x1b[1my\x1b[0m")
+
+    def test_format(self):
+        string = ANSIString("hi {0}, {name!s:*^5}!").fg_4b(Foreground.RED, slice(3, 6))
+        expected = ANSIString("hi ab, **x**!", {3: "\x1b[31m\x1b[1m", 4: "\x1b[31m"})
+        self.assertEqual(string.format(ANSIString("ab").fm(SGR.BOLD, slice(0, 1)), name="x"), expected)
+        template = StyledTemplate(string)
+        self.assertEqual(template.format("a", name="b").plain, "hi a, **b**!")
+        self.assertEqual(ANSIString("{x}").format_map({"x": 1}), ANSIString("1"))
+
+    def test_nested_fields(self):
+        self.assertEqual(ANSIString("{0:>{1}}|").format("x", 4), ANSIString("   x|"))
+        self.assertEqual(ANSIString("{v:{w}}").format(v=3, w=5), ANSIString("    3"))
+        self.assertEqual(ANSIString("{:{}.{}f}|{}").format(3.14159, 6, 2, "a").plain, "{:{}.{}f}|{}".format(3.14159, 6, 2, "a"))
+        string = ANSIString("[{0:{fill}^{width}}]").fm(SGR.BOLD, slice(1, 2))
+        expected = ANSIString("[--ab--]", {index: "\x1b[1m" for index in range(1, 7)})
+        self.assertEqual(string.format("ab", fill="-", width=6), expected)
+        self.assertEqual(StyledTemplate(string).render("ab", fill="-", width=6), "[\x1b[1m--ab--\x1b[0m]")
+
+    def test_errors(self):
+        for template in ("{", "a}", "{0}{}", "{}{0}", "{x!z}", "{:{0}}", "{:{x!z}}", "{:{{}}}"):
+            with self.assertRaises(ValueError):
+                StyledTemplate(template)
+        with self.assertRaises(KeyError):
+            StyledTemplate("{x}").render()
+
+
+if __name__ == "__main__":
+    unittest.main()